@@ -0,0 +1 @@
+"""Micro-benchmarks for the pattern implementations, run as ``python -m benchmarks.<module>``."""
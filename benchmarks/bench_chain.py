@@ -0,0 +1,217 @@
+"""
+Chain of Responsibility Benchmarks
+
+Compares the linked `handle` walk with `CompiledChain` lookups for chains of exact-match handlers, and
+measures `handle_many` batch routing on a very long chain, `AdaptiveChain` under skewed traffic,
+`AsyncAbstractHandler.handle_batch` against handlers with simulated backend latency, and compiled
+matcher handlers (exact, prefix, glob, regex) at 10k rules.
+
+Run with:
+    python -m benchmarks.bench_chain
+"""
+
+import asyncio
+import random
+import time
+import timeit
+from typing import Optional
+
+from src.oop.patterns.behavioral.chain import (
+    AbstractHandler,
+    AsyncAbstractHandler,
+    ExactHandler,
+    GlobHandler,
+    PrefixHandler,
+    RegexHandler,
+)
+
+CHAIN_LENGTHS: tuple[int, ...] = (3, 100, 10_000)
+BATCH_HANDLERS = 100_000
+BATCH_REQUESTS = 1_000_000
+SKEWED_HANDLERS = 100
+SKEWED_REQUESTS = 200_000
+ASYNC_LATENCY = 0.005
+ASYNC_REQUESTS = 500
+ASYNC_CONCURRENCY: tuple[int, ...] = (1, 10, 100)
+MATCHER_RULES = 10_000
+MATCHER_REQUESTS = 2_000
+
+
+class KeyHandler(AbstractHandler):
+    """Exact-match handler for a single generated key."""
+
+    order_independent = True
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.accepts = frozenset({key})
+
+    def process(self, request: str) -> Optional[str]:
+        """Handle the request if it equals this handler's key."""
+        if request == self.key:
+            return f"KeyHandler: Handling {request}"
+        return None
+
+
+class LatencyHandler(AsyncAbstractHandler):
+    """Async exact-match handler that waits `latency` seconds per probe, like a backend call."""
+
+    def __init__(self, key: str, latency: float) -> None:
+        self.key = key
+        self.latency = latency
+
+    async def process(self, request: str) -> Optional[str]:
+        """Handle the request if it equals the key, after the simulated backend latency."""
+        await asyncio.sleep(self.latency)
+        if request == self.key:
+            return f"LatencyHandler: Handling {request}"
+        return None
+
+
+def build_chain(length: int) -> AbstractHandler:
+    """Build a chain of `length` KeyHandlers accepting 'key-0' .. 'key-<length-1>'."""
+    head = KeyHandler("key-0")
+    node: AbstractHandler = head
+    for index in range(1, length):
+        node = node.set_next(KeyHandler(f"key-{index}"))  # type: ignore[assignment]
+    return head
+
+
+def bench(length: int, number: int = 1_000) -> tuple[float, float]:
+    """Return seconds per request for the linked walk and the compiled chain, averaged over all keys."""
+    head = build_chain(length)
+    compiled = head.compile()
+    keys = [f"key-{index}" for index in range(0, length, max(1, length // 100))]
+
+    linked = timeit.timeit(lambda: [head.handle(key) for key in keys], number=max(1, number // length))
+    table = timeit.timeit(lambda: [compiled.handle(key) for key in keys], number=max(1, number // length))
+    runs = max(1, number // length) * len(keys)
+    return linked / runs, table / runs
+
+
+def bench_batch(handlers: int, requests: int) -> tuple[float, float]:
+    """Return seconds to compile a chain of `handlers` and to route `requests` random keys with handle_many."""
+    head = build_chain(handlers)
+    rng = random.Random(0)
+    batch = [f"key-{rng.randrange(handlers + handlers // 10)}" for _ in range(requests)]
+
+    start = time.perf_counter()
+    compiled = head.compile()
+    compiled_at = time.perf_counter()
+    compiled.handle_many(batch)
+    return compiled_at - start, time.perf_counter() - compiled_at
+
+
+def bench_skewed(handlers: int, requests: int) -> tuple[float, float, float]:
+    """Route Zipf-distributed traffic whose hottest keys sit at the end of the chain.
+
+    Returns seconds for the linked walk, seconds for an AdaptiveChain, and the adaptive average probe depth.
+    """
+    head = build_chain(handlers)
+    adaptive = head.adaptive(reorder_interval=1_000)
+    keys = [f"key-{index}" for index in reversed(range(handlers))]
+    weights = [1 / rank for rank in range(1, handlers + 1)]
+    traffic = random.Random(0).choices(keys, weights, k=requests)
+
+    start = time.perf_counter()
+    for request in traffic:
+        head.handle(request)
+    linked_at = time.perf_counter()
+    for request in traffic:
+        adaptive.handle(request)
+    return linked_at - start, time.perf_counter() - linked_at, adaptive.average_probe_depth()
+
+
+def bench_async(concurrency: int, requests: int, latency: float) -> float:
+    """Return seconds to route `requests` through a three-handler async chain at the given concurrency."""
+    head = LatencyHandler("key-0", latency)
+    second = LatencyHandler("key-1", latency)
+    head.set_next(second)
+    second.set_next(LatencyHandler("key-2", latency))
+    batch = [f"key-{index % 3}" for index in range(requests)]
+
+    start = time.perf_counter()
+    asyncio.run(head.handle_batch(batch, concurrency=concurrency))
+    return time.perf_counter() - start
+
+
+def build_matcher_chain(rules: int) -> AbstractHandler:
+    """Build a chain of `rules` matchers cycling through exact, prefix, glob and regex rules."""
+    handlers: list[AbstractHandler] = []
+    for index in range(rules):
+        kind = index % 4
+        if kind == 0:
+            handlers.append(ExactHandler(f"route.{index}.exact"))
+        elif kind == 1:
+            handlers.append(PrefixHandler(f"route.{index}.prefix/"))
+        elif kind == 2:
+            handlers.append(GlobHandler(f"route.{index}.*.glob"))
+        else:
+            handlers.append(RegexHandler(f"route\\.{index}\\.re\\.[0-9]+"))
+    for current, following in zip(handlers, handlers[1:]):
+        current.set_next(following)
+    return handlers[0]
+
+
+def bench_matchers(rules: int, requests: int) -> tuple[float, float, float]:
+    """Return compile seconds and per-request seconds for the linked walk and the compiled chain."""
+    head = build_matcher_chain(rules)
+    rng = random.Random(0)
+    samples = {
+        0: "route.{}.exact",
+        1: "route.{}.prefix/a/b",
+        2: "route.{}.x.glob",
+        3: "route.{}.re.123",
+    }
+    batch = []
+    for _ in range(requests):
+        index = rng.randrange(rules)
+        batch.append(samples[index % 4].format(index))
+
+    start = time.perf_counter()
+    compiled = head.compile()
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    linked = [head.handle(request) for request in batch]
+    linked_time = time.perf_counter() - start
+    start = time.perf_counter()
+    routed = [compiled.handle(request) for request in batch]
+    compiled_time = time.perf_counter() - start
+    assert routed == linked
+    return compile_time, linked_time / requests, compiled_time / requests
+
+
+def main() -> None:
+    """Print per-request latency for each chain length, then batch routing throughput."""
+    print(f"{'handlers':>10} {'linked (us)':>14} {'compiled (us)':>14} {'speedup':>9}")
+    for length in CHAIN_LENGTHS:
+        linked, compiled = bench(length)
+        print(f"{length:>10} {linked * 1e6:>14.3f} {compiled * 1e6:>14.3f} {linked / compiled:>8.1f}x")
+
+    compile_time, route_time = bench_batch(BATCH_HANDLERS, BATCH_REQUESTS)
+    print(
+        f"\nhandle_many: {BATCH_REQUESTS:,} requests over {BATCH_HANDLERS:,} handlers "
+        f"(compile {compile_time:.2f}s, route {route_time:.2f}s, {BATCH_REQUESTS / route_time:,.0f} req/s)"
+    )
+
+    linked_time, adaptive_time, depth = bench_skewed(SKEWED_HANDLERS, SKEWED_REQUESTS)
+    print(
+        f"\nskewed traffic, {SKEWED_HANDLERS} handlers: linked {linked_time:.2f}s, "
+        f"adaptive {adaptive_time:.2f}s (average probe depth {depth:.1f})"
+    )
+
+    print(f"\nasync handle_batch, {ASYNC_REQUESTS} requests, {ASYNC_LATENCY * 1e3:.0f} ms per probe")
+    for concurrency in ASYNC_CONCURRENCY:
+        elapsed = bench_async(concurrency, ASYNC_REQUESTS, ASYNC_LATENCY)
+        print(f"{concurrency:>10} concurrent: {elapsed:.2f}s ({ASYNC_REQUESTS / elapsed:,.0f} req/s)")
+
+    compile_time, linked, compiled = bench_matchers(MATCHER_RULES, MATCHER_REQUESTS)
+    print(
+        f"\nmatchers, {MATCHER_RULES:,} rules: compile {compile_time:.2f}s, linked {linked * 1e6:.1f} us/req, "
+        f"compiled {compiled * 1e6:.1f} us/req ({linked / compiled:.0f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Command Pattern Benchmarks
+
+Measures CommandBus throughput for 1 to 16 workers against orders with simulated backend latency, and
+CommandJournal durable commits per second for several group-commit windows, and the per-command memory
+of a list of command objects versus a CompactCommandStore (measured with tracemalloc), with commands
+spread over a few orders and with one order per command.
+
+Run with:
+    python -m benchmarks.bench_command
+"""
+
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Callable, MutableSequence
+
+from src.oop.patterns.behavioral.command import (
+    CancelOrderCommand,
+    Command,
+    CommandBus,
+    CommandJournal,
+    CompactCommandStore,
+    Order,
+    PlaceOrderCommand,
+)
+
+BUS_WORKERS: tuple[int, ...] = (1, 2, 4, 8, 16)
+BUS_COMMANDS = 2_000
+BUS_ORDERS = 64
+ORDER_LATENCY = 0.001
+JOURNAL_WINDOWS: tuple[float, ...] = (0.0, 0.001, 0.005, 0.020)
+JOURNAL_WRITERS = 32
+JOURNAL_SECONDS = 1.0
+MEMORY_COMMANDS = 1_000_000
+MEMORY_ORDERS = 10_000
+
+
+class LatencyOrder(Order):
+    """Order whose actions wait `latency` seconds, like a call to an order backend."""
+
+    def __init__(self, latency: float) -> None:
+        super().__init__()
+        self.latency = latency
+
+    def place(self) -> None:
+        """Place the order after the simulated latency."""
+        time.sleep(self.latency)
+
+    def cancel(self) -> None:
+        """Cancel the order after the simulated latency."""
+        time.sleep(self.latency)
+
+
+def bench_bus(workers: int, commands: int, orders: int, latency: float) -> float:
+    """Return commands per second for `commands` spread round-robin over `orders`."""
+    targets = [LatencyOrder(latency) for _ in range(orders)]
+    batch: list[Command] = []
+    for index in range(commands):
+        order = targets[index % orders]
+        batch.append(PlaceOrderCommand(order) if index // orders % 2 == 0 else CancelOrderCommand(order))
+
+    start = time.perf_counter()
+    with CommandBus(workers=workers, max_pending=256) as bus:
+        futures = [bus.submit(command) for command in batch]
+        for future in futures:
+            future.result()
+    return commands / (time.perf_counter() - start)
+
+
+def bench_journal(window: float, writers: int, seconds: float) -> tuple[float, float]:
+    """Return durable commits per second and records per fsync.
+
+    Each of the `writers` threads waits for its record to be durable before appending the next one.
+    """
+    stop = threading.Event()
+
+    def writer(journal: CommandJournal) -> None:
+        command = PlaceOrderCommand(Order())
+        while not stop.is_set():
+            journal.append(command).result()
+
+    with tempfile.TemporaryDirectory() as directory:
+        journal = CommandJournal(os.path.join(directory, "bench.journal"), commit_window=window)
+        threads = [threading.Thread(target=writer, args=(journal,)) for _ in range(writers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        journal.close()
+        stats = journal.stats()
+    return stats.records / elapsed, stats.records / max(1, stats.commits)
+
+
+def bench_memory(factory: Callable[[], MutableSequence[Command]], commands: int, orders: int) -> float:
+    """Return bytes allocated per command when appending `commands` order commands to `factory()`."""
+    targets = [Order() for _ in range(orders)]
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    store = factory()
+    for index in range(commands):
+        order = targets[index % orders]
+        store.append(PlaceOrderCommand(order) if index % 2 == 0 else CancelOrderCommand(order))
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / commands
+
+
+def main() -> None:
+    """Print CommandBus throughput for each worker count, then journal throughput per commit window."""
+    print(f"CommandBus, {BUS_COMMANDS} commands over {BUS_ORDERS} orders, {ORDER_LATENCY * 1e3:.0f} ms per action")
+    print(f"{'workers':>10} {'commands/s':>12}")
+    for workers in BUS_WORKERS:
+        print(f"{workers:>10} {bench_bus(workers, BUS_COMMANDS, BUS_ORDERS, ORDER_LATENCY):>12,.0f}")
+
+    print(f"\nCommandJournal, {JOURNAL_WRITERS} writers waiting for durability")
+    print(f"{'window (ms)':>12} {'commits/s':>12} {'records/fsync':>14}")
+    for window in JOURNAL_WINDOWS:
+        rate, batch = bench_journal(window, JOURNAL_WRITERS, JOURNAL_SECONDS)
+        print(f"{window * 1e3:>12.0f} {rate:>12,.0f} {batch:>14.1f}")
+
+    for orders in (MEMORY_ORDERS, MEMORY_COMMANDS):
+        print(f"\nmemory per command, {MEMORY_COMMANDS:,} commands over {orders:,} orders")
+        as_objects = bench_memory(list, MEMORY_COMMANDS, orders)
+        compact = bench_memory(CompactCommandStore, MEMORY_COMMANDS, orders)
+        print(f"{'list of objects':>20} {as_objects:>8.1f} B")
+        print(f"{'CompactCommandStore':>20} {compact:>8.1f} B ({compact / as_objects:.0%} of the list)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Iterator Pattern Benchmarks
+
+Compares walking a MyBookCollection with the classic BookIterator loop, native `for` iteration and
+`iter_batches`, the memory per book of MyBookCollection against ColumnarBookCollection, and author and
+title-prefix lookups with and without the secondary indexes as the collection grows, and the external
+merge sort of `sorted_iterator` under a memory cap far below the data size against an in-memory sort.
+
+Run with:
+    python -m benchmarks.bench_iterator
+"""
+
+import time
+import tracemalloc
+from itertools import islice
+from typing import Callable, TypeVar
+
+from src.oop.patterns.behavioral.iterator import Book, ColumnarBookCollection, MyBookCollection
+
+BOOKS = 10_000_000
+BATCH_SIZE = 4_096
+MEMORY_BOOKS = 1_000_000
+LOOKUP_SIZES = (10_000, 100_000, 1_000_000)
+LOOKUPS = 100
+RESULTS = 10
+SORT_BOOKS = 2_000_000
+SORT_MEMORY_LIMIT = 16 * 2**20
+
+CollectionT = TypeVar("CollectionT", bound=MyBookCollection | ColumnarBookCollection)
+
+
+def fill_collection(collection: CollectionT, books: int) -> CollectionT:
+    """Add `books` books sharing a small set of authors to `collection`."""
+    authors = [f"Author {index}" for index in range(1_000)]
+    for index in range(books):
+        collection.add_book(Book(f"Title {index}", authors[index % len(authors)]))
+    return collection
+
+
+def build_collection(books: int) -> MyBookCollection:
+    """Build a list-backed collection of `books` books."""
+    return fill_collection(MyBookCollection(), books)
+
+
+def bytes_per_book(factory: Callable[[], MyBookCollection | ColumnarBookCollection], books: int) -> float:
+    """Return the traced allocation per book left alive by building a collection."""
+    tracemalloc.start()
+    collection = fill_collection(factory(), books)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del collection
+    return current / books
+
+
+def lookup_time(collection: MyBookCollection, query: Callable[[MyBookCollection, int], int]) -> float:
+    """Return the average seconds per lookup over LOOKUPS queries, after one warm-up query."""
+    query(collection, 0)
+    start = time.perf_counter()
+    for index in range(LOOKUPS):
+        query(collection, index)
+    return (time.perf_counter() - start) / LOOKUPS
+
+
+def author_query(collection: MyBookCollection, index: int) -> int:
+    """Fetch the first RESULTS books of one author."""
+    return len(list(islice(collection.by_author(f"Author {index}"), RESULTS)))
+
+
+def prefix_query(collection: MyBookCollection, index: int) -> int:
+    """Fetch the first RESULTS books whose title starts with a four-digit prefix."""
+    return len(list(islice(collection.title_prefix(f"Title {1000 + index}"), RESULTS)))
+
+
+def bench_lookups() -> None:
+    """Print author and prefix lookup times for scanning and indexed collections of growing size."""
+    print(f"first {RESULTS} results of a lookup, average of {LOOKUPS}")
+    for size in LOOKUP_SIZES:
+        for indexed in (False, True):
+            collection = fill_collection(MyBookCollection(indexed=indexed), size)
+            label = f"{size:,} {'indexed' if indexed else 'scan'}"
+            author = lookup_time(collection, author_query)
+            prefix = lookup_time(collection, prefix_query)
+            print(f"{label:>24}: by_author {author * 1e6:10.1f} µs, title_prefix {prefix * 1e6:10.1f} µs")
+
+
+def bench_sort() -> None:
+    """Print time and peak traced memory for sorting a columnar collection by title."""
+    collection = fill_collection(ColumnarBookCollection(), SORT_BOOKS)
+    print(f"sorting {SORT_BOOKS:,} books by title ({collection.nbytes() / 2**20:.0f} MiB columnar)")
+
+    def external() -> str:
+        iterator = collection.sorted_iterator(memory_limit=SORT_MEMORY_LIMIT)
+        last = ""
+        while iterator.has_next():
+            last = iterator.next().title
+        return f"{iterator.runs} runs, last {last!r}"
+
+    def in_memory() -> str:
+        return f"last {sorted(collection, key=lambda book: book.title)[-1].title!r}"
+
+    for name, sort in [(f"sorted_iterator({SORT_MEMORY_LIMIT // 2**20} MiB)", external), ("sorted(list)", in_memory)]:
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = sort()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:>24}: {elapsed:.2f}s, peak {peak / 2**20:.0f} MiB ({result})")
+
+
+def classic(collection: MyBookCollection) -> int:
+    """Count books through has_next()/next()."""
+    count = 0
+    iterator = collection.create_iterator()
+    while iterator.has_next():
+        iterator.next()
+        count += 1
+    return count
+
+
+def native(collection: MyBookCollection) -> int:
+    """Count books with a for loop."""
+    count = 0
+    for _ in collection:
+        count += 1
+    return count
+
+
+def batches(collection: MyBookCollection) -> int:
+    """Count books batch by batch."""
+    count = 0
+    for batch in collection.iter_batches(BATCH_SIZE):
+        count += len(batch)
+    return count
+
+
+def main() -> None:
+    """Print the time and per-book cost of each iteration path."""
+    collection = build_collection(BOOKS)
+    paths: list[tuple[str, Callable[[MyBookCollection], int]]] = [
+        ("BookIterator", classic),
+        ("for book in collection", native),
+        (f"iter_batches({BATCH_SIZE})", batches),
+    ]
+    print(f"iterating {BOOKS:,} books")
+    for name, walk in paths:
+        start = time.perf_counter()
+        count = walk(collection)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>24}: {elapsed:.2f}s ({elapsed / count * 1e9:.1f} ns/book)")
+    del collection
+
+    print(f"memory for {MEMORY_BOOKS:,} books")
+    factories: list[tuple[str, Callable[[], MyBookCollection | ColumnarBookCollection]]] = [
+        ("MyBookCollection", MyBookCollection),
+        ("ColumnarBookCollection", ColumnarBookCollection),
+    ]
+    for name, factory in factories:
+        print(f"{name:>24}: {bytes_per_book(factory, MEMORY_BOOKS):.1f} B/book")
+
+    bench_lookups()
+    bench_sort()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Mediator Pattern Benchmarks
+
+Measures ChatRoom broadcast fanout (messages per second and deliveries per second) at 1k, 100k and 1M
+members, against the previous list scan that compared every member with the sender; and TopicMediator
+publishing over 100k subscriptions with a Zipf-skewed topic mix, against matching every subscription;
+BufferedChatRoom throughput with flush windows of 0, 1 ms and 10 ms against unbuffered ChatRoom; and
+ShardedChatRoom scaling from 1 to N worker processes with CPU-bound colleagues.
+
+Run with:
+    python -m benchmarks.bench_mediator
+"""
+
+import os
+import random
+import time
+from typing import List, Sequence
+
+from src.oop.patterns.behavioral.mediator import (
+    BufferedChatRoom,
+    ChatRoom,
+    Colleague,
+    Mediator,
+    ShardedChatRoom,
+    TopicMediator,
+)
+
+ROOM_SIZES = (1_000, 100_000, 1_000_000)
+DELIVERIES = 5_000_000
+SUBSCRIPTIONS = 100_000
+PRODUCTS = 10_000
+REGIONS = ("eu", "us", "apac", "latam", "mea", "cn", "jp", "in", "uk", "ca")
+WILDCARD_SHARE = 0.02
+PUBLISHES = 100_000
+SCAN_PUBLISHES = 100
+BUFFERED_MEMBERS = 1_000
+BUFFERED_MESSAGES = 20_000
+FLUSH_WINDOWS = (0.0, 0.001, 0.01)
+CPU_MEMBERS = 64
+CPU_MESSAGES = 50
+CPU_WORK = 20_000
+
+
+class Sink(Colleague):
+    """Colleague that only counts what it receives."""
+
+    def __init__(self, mediator: Mediator) -> None:
+        super().__init__(mediator)
+        self.count = 0
+
+    def send(self, message: str) -> None:
+        """Send a message through the mediator."""
+        self.mediator.send(message, self)
+
+    def receive(self, message: str) -> None:
+        """Count the message."""
+        self.count += 1
+
+
+class BatchSink(Sink):
+    """Sink that takes a whole batch in one call."""
+
+    def receive_batch(self, messages: Sequence[str]) -> None:
+        """Count the batch's messages."""
+        self.count += len(messages)
+
+
+class BurnSink(Sink):
+    """Sink that does CPU-bound work for every message."""
+
+    def receive(self, message: str) -> None:
+        """Burn CPU, then count the message."""
+        _ = sum(range(CPU_WORK))
+        self.count += 1
+
+
+class ListChatRoom(Mediator):
+    """The list-scanning room ChatRoom replaced, kept as a baseline."""
+
+    def __init__(self) -> None:
+        self.colleagues: List[Colleague] = []
+
+    def add_colleague(self, colleague: Colleague) -> None:
+        """Append a colleague."""
+        self.colleagues.append(colleague)
+
+    def send(self, message: str, colleague: Colleague) -> None:
+        """Deliver to every colleague that is not the sender."""
+        for c in self.colleagues:
+            if c != colleague:
+                c.receive(message)
+
+
+def fanout(room: ChatRoom | ListChatRoom, members: int) -> tuple[float, float]:
+    """Return messages and deliveries per second for a room of `members` sinks."""
+    sinks = [Sink(room) for _ in range(members)]
+    for sink in sinks:
+        room.add_colleague(sink)
+    messages = max(1, DELIVERIES // members)
+    sender = sinks[members // 2]
+    start = time.perf_counter()
+    for _ in range(messages):
+        room.send("hello", sender)
+    elapsed = time.perf_counter() - start
+    return messages / elapsed, messages * (members - 1) / elapsed
+
+
+def topic_subscriptions(rng: random.Random) -> list[str]:
+    """Return SUBSCRIPTIONS patterns: exact `orders.<product>.<region>` topics plus some wildcards."""
+    patterns = []
+    for index in range(SUBSCRIPTIONS):
+        product, region = f"p{index % PRODUCTS}", REGIONS[index // PRODUCTS % len(REGIONS)]
+        if rng.random() < WILDCARD_SHARE:
+            patterns.append(rng.choice([f"orders.*.{region}", f"orders.{product}.*"]))
+        else:
+            patterns.append(f"orders.{product}.{region}")
+    return patterns
+
+
+def skewed_topics(rng: random.Random, count: int) -> list[str]:
+    """Return `count` topics whose products follow a Zipf(1) distribution."""
+    weights = [1 / rank for rank in range(1, PRODUCTS + 1)]
+    products = rng.choices(range(PRODUCTS), weights, k=count)
+    return [f"orders.p{product}.{rng.choice(REGIONS)}" for product in products]
+
+
+def scan_publish(subscriptions: list[tuple[list[str], Sink]], topic: str) -> int:
+    """Deliver by matching the topic against every subscription, the cost TopicMediator avoids."""
+    segments = topic.split(".")
+    delivered = 0
+    for pattern, sink in subscriptions:
+        if len(pattern) == len(segments) and all(p in ("*", s) for p, s in zip(pattern, segments)):
+            sink.receive(topic)
+            delivered += 1
+    return delivered
+
+
+def bench_topics() -> None:
+    """Print publish rates for the topic trie and for a linear scan of the subscriptions."""
+    rng = random.Random(42)
+    mediator = TopicMediator()
+    patterns = topic_subscriptions(rng)
+    sinks = [Sink(mediator) for _ in patterns]
+    for pattern, sink in zip(patterns, sinks):
+        mediator.subscribe(sink, pattern)
+    topics = skewed_topics(rng, PUBLISHES)
+    print(f"{len(mediator):,} subscriptions, Zipf-skewed topics")
+
+    start = time.perf_counter()
+    delivered = sum(mediator.publish(topic, "hello") for topic in topics)
+    elapsed = time.perf_counter() - start
+    print(f"{'TopicMediator':>24}: {PUBLISHES / elapsed:>10,.0f} msg/s ({delivered / PUBLISHES:.1f} deliveries/msg)")
+
+    subscriptions = [(pattern.split("."), sink) for pattern, sink in zip(patterns, sinks)]
+    start = time.perf_counter()
+    delivered = sum(scan_publish(subscriptions, topic) for topic in topics[:SCAN_PUBLISHES])
+    elapsed = time.perf_counter() - start
+    print(f"{'scan':>24}: {SCAN_PUBLISHES / elapsed:>10,.0f} msg/s ({delivered / SCAN_PUBLISHES:.1f} deliveries/msg)")
+
+
+def buffered_rate(room: ChatRoom) -> float:
+    """Return messages per second from the first send until every member has received everything."""
+    sinks = [BatchSink(room) for _ in range(BUFFERED_MEMBERS)]
+    for sink in sinks:
+        room.add_colleague(sink)
+    sender = Sink(room)
+    start = time.perf_counter()
+    for _ in range(BUFFERED_MESSAGES):
+        room.send("hello", sender)
+    if isinstance(room, BufferedChatRoom):
+        room.close()
+    elapsed = time.perf_counter() - start
+    assert all(sink.count == BUFFERED_MESSAGES for sink in sinks)
+    return BUFFERED_MESSAGES / elapsed
+
+
+def bench_buffered() -> None:
+    """Print delivery throughput for unbuffered and buffered rooms."""
+    print(f"{BUFFERED_MESSAGES:,} messages to {BUFFERED_MEMBERS:,} batch-aware members")
+    print(f"{'ChatRoom':>24}: {buffered_rate(ChatRoom()):>10,.0f} msg/s")
+    for window in FLUSH_WINDOWS:
+        rate = buffered_rate(BufferedChatRoom(window=window))
+        print(f"{f'window {window * 1e3:g} ms':>24}: {rate:>10,.0f} msg/s")
+
+
+def sharded_rate(room: ChatRoom | ShardedChatRoom) -> float:
+    """Return messages per second broadcast to CPU_MEMBERS CPU-bound colleagues, including shutdown."""
+    for _ in range(CPU_MEMBERS):
+        room.add_colleague(BurnSink(room))
+    sender = Sink(room)
+    if isinstance(room, ShardedChatRoom):
+        room.start()
+    start = time.perf_counter()
+    for _ in range(CPU_MESSAGES):
+        room.send("hello", sender)
+    if isinstance(room, ShardedChatRoom):
+        room.close()
+    elapsed = time.perf_counter() - start
+    assert all(isinstance(sink, Sink) and sink.count == CPU_MESSAGES for sink in room.colleagues)
+    return CPU_MESSAGES / elapsed
+
+
+def bench_sharded() -> None:
+    """Print CPU-bound broadcast throughput in-process and with 1 to os.cpu_count() shard processes."""
+    cores = os.cpu_count() or 1
+    workers = sorted({1, cores, *(2**power for power in range(cores.bit_length()) if 2**power <= cores)})
+    print(f"{CPU_MESSAGES} messages to {CPU_MEMBERS} CPU-bound members, {cores} cores")
+    print(f"{'ChatRoom':>24}: {sharded_rate(ChatRoom()):>10,.1f} msg/s")
+    for count in workers:
+        print(f"{f'{count} shard processes':>24}: {sharded_rate(ShardedChatRoom(count)):>10,.1f} msg/s")
+
+
+def main() -> None:
+    """Print the broadcast rate of each room implementation at each size, then topic routing rates."""
+    for members in ROOM_SIZES:
+        rooms: list[tuple[str, ChatRoom | ListChatRoom]] = [("list scan", ListChatRoom()), ("ChatRoom", ChatRoom())]
+        for name, room in rooms:
+            rate, deliveries = fanout(room, members)
+            print(f"{members:>9,} members {name:>9}: {rate:>10,.1f} msg/s ({deliveries / 1e6:.1f}M deliveries/s)")
+    bench_topics()
+    bench_buffered()
+    bench_sharded()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Memento Pattern Benchmarks
+
+Types 1M keystrokes into a 10 MB document with TextEditor's PieceTable buffer: runs of typing with a
+backspace now and then, moving the cursor to a random position every CURSOR_RUN keystrokes, then again
+with a cursor jump on every keystroke. A plain string buffer is timed on a small sample of the same
+workload, since every keystroke copies the whole document.
+
+Run with:
+    python -m benchmarks.bench_memento
+"""
+
+import random
+import time
+
+from src.oop.patterns.behavioral.memento import PieceTable
+
+DOCUMENT_BYTES = 10 * 2**20
+KEYSTROKES = 1_000_000
+RANDOM_KEYSTROKES = 100_000
+STRING_KEYSTROKES = 1_000
+CURSOR_RUN = 100
+BACKSPACE_SHARE = 0.05
+
+
+def keystrokes(rng: random.Random, count: int, run: int) -> list[tuple[int, str]]:
+    """Return `count` (cursor jump or -1, key) pairs; a backspace key is "\\b"."""
+    return [
+        (
+            rng.randrange(DOCUMENT_BYTES) if index % run == 0 else -1,
+            "\b" if rng.random() < BACKSPACE_SHARE else rng.choice("abcdefghijklmnopqrstuvwxyz "),
+        )
+        for index in range(count)
+    ]
+
+
+def type_piece_table(document: str, keys: list[tuple[int, str]]) -> float:
+    """Return the seconds PieceTable takes to apply the keystrokes and materialize the text once."""
+    buffer = PieceTable(document)
+    cursor = 0
+    start = time.perf_counter()
+    for jump, key in keys:
+        if jump >= 0:
+            cursor = min(jump, len(buffer))
+        if key == "\b":
+            if cursor:
+                cursor -= 1
+                buffer.delete(cursor, 1)
+        else:
+            buffer.insert(cursor, key)
+            cursor += 1
+    buffer.get_text()
+    return time.perf_counter() - start
+
+
+def type_string(document: str, keys: list[tuple[int, str]]) -> float:
+    """Return the seconds a plain string takes to apply the keystrokes."""
+    text = document
+    cursor = 0
+    start = time.perf_counter()
+    for jump, key in keys:
+        if jump >= 0:
+            cursor = min(jump, len(text))
+        if key == "\b":
+            if cursor:
+                cursor -= 1
+                text = text[:cursor] + text[cursor + 1 :]
+        else:
+            text = text[:cursor] + key + text[cursor:]
+            cursor += 1
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Print the time per keystroke for each buffer and workload."""
+    rng = random.Random(42)
+    document = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz \n") for _ in range(DOCUMENT_BYTES))
+    print(f"typing into a {DOCUMENT_BYTES / 2**20:.0f} MB document")
+    workloads = [
+        (f"PieceTable, jump every {CURSOR_RUN}", type_piece_table, keystrokes(rng, KEYSTROKES, CURSOR_RUN)),
+        ("PieceTable, jump every key", type_piece_table, keystrokes(rng, RANDOM_KEYSTROKES, 1)),
+        (f"str, jump every {CURSOR_RUN}", type_string, keystrokes(rng, STRING_KEYSTROKES, CURSOR_RUN)),
+    ]
+    for name, run, keys in workloads:
+        elapsed = run(document, keys)
+        print(f"{name:>32}: {len(keys):>9,} keys in {elapsed:6.2f}s ({elapsed / len(keys) * 1e6:8.2f} µs/key)")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,10 +10,21 @@ Classes:
     LowLevelHandler (concrete class): Handles low-level requests.
     MidLevelHandler (concrete class): Handles mid-level requests.
     HighLevelHandler (concrete class): Handles high-level requests.
+    ExactHandler, PrefixHandler, GlobHandler, RegexHandler (concrete classes): Declarative matcher handlers.
+    CompiledChain (concrete class): Snapshot of a chain with lookup structures for declarative handlers.
+    AdaptiveChain (concrete class): Snapshot of a chain that moves frequently matching handlers to the front.
+    CachedChain (concrete class): Bounded LRU cache of results in front of a chain, invalidated on relinking.
+    AsyncHandler (abstract class): Defines the asyncio interface for setting the next handler and handling requests.
+    AsyncAbstractHandler (concrete class): Implements asyncio chaining, running sync handlers on an executor.
 """
 
+import asyncio
+import re
+import time
 from abc import ABC, abstractmethod
-from typing import Optional
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Executor
+from typing import Iterator, NamedTuple, Optional, Sequence, TypeGuard, Union
 
 
 class Handler(ABC):
@@ -46,29 +57,106 @@ class AbstractHandler(Handler):
     Provides default chaining behavior. Can pass requests to the next handler in the chain if the current handler
     cannot process the request.
 
+    Subclasses put their own logic in `process` and leave forwarding to `handle`. A subclass that only
+    accepts requests matching a fixed description declares it in `accepts`, `accepts_prefixes` or
+    `accepts_regex`, which lets `compile` route those requests through a lookup table, a prefix trie or
+    a combined regex instead of probing every handler. `process` must accept exactly what is declared.
+
     Attributes:
+        accepts (Optional[frozenset[str]]): Exact requests this handler processes, or None for arbitrary predicates.
+        accepts_prefixes (Optional[frozenset[str]]): Prefixes of the requests this handler processes.
+        accepts_regex (Optional[str]): Regex that fully matches the requests this handler processes.
+        order_independent (bool): True if no other handler in a chain accepts the same requests as this one,
+            so moving it does not change which handler wins.
         _next_handler (Optional[Handler]): The next handler in the chain, or None if there is no next handler.
+        _generation (int): Class-wide counter bumped by every `set_next`, used to detect relinking.
 
     Methods:
         set_next(handler: 'Handler') -> 'Handler':
             Set the next handler in the chain and return the handler.
+        process(request: str) -> Optional[str]:
+            Process the request without forwarding it.
         handle(request: str) -> Optional[str]:
             Process the request or pass it to the next handler.
+        handle_many(requests: Sequence[str]) -> list[Optional[str]]:
+            Route a batch of requests in one pass.
+        compile() -> 'CompiledChain':
+            Snapshot the chain starting at this handler into a CompiledChain.
+        adaptive(reorder_interval: int) -> 'AdaptiveChain':
+            Snapshot the chain starting at this handler into an AdaptiveChain.
+        cached(maxsize: int, ttl: Optional[float]) -> 'CachedChain':
+            Put a bounded LRU result cache in front of the chain starting at this handler.
     """
 
+    accepts: Optional[frozenset[str]] = None
+    accepts_prefixes: Optional[frozenset[str]] = None
+    accepts_regex: Optional[str] = None
+    order_independent: bool = False
     _next_handler: Optional[Handler] = None
+    _generation: int = 0
 
     def set_next(self, handler: "Handler") -> "Handler":
         """Set the next handler in the chain."""
         self._next_handler = handler
+        AbstractHandler._generation += 1
         return handler
 
-    def handle(self, request: str) -> Optional[str]:
-        """Process the request or pass it to the next handler in the chain."""
-        if self._next_handler:
-            return self._next_handler.handle(request)
+    def process(self, request: str) -> Optional[str]:  # pylint: disable=unused-argument
+        """Process the request without forwarding it; return None if this handler does not accept it."""
         return None
 
+    def is_declarative(self) -> bool:
+        """Return True if this handler declares what it accepts, so `compile` does not need to probe it."""
+        return self.accepts is not None or self.accepts_prefixes is not None or self.accepts_regex is not None
+
+    def handle(self, request: str) -> Optional[str]:
+        """Process the request or pass it to the next handler in the chain.
+
+        The chain is walked in a loop rather than by recursing into each link, so chain length is not
+        bounded by the recursion limit. A handler that overrides `handle` is delegated to as-is.
+        """
+        result = self.process(request)  # pylint: disable=assignment-from-none
+        node = self._next_handler
+        # Only AbstractHandler subclasses inherit this method, so comparing it stands in for isinstance.
+        forward = AbstractHandler.handle
+        while result is None and node is not None:
+            if type(node).handle is not forward:
+                return node.handle(request)
+            result = node.process(request)  # type: ignore[attr-defined]
+            node = node._next_handler  # type: ignore[attr-defined]  # pylint: disable=protected-access
+        return result
+
+    def handle_many(self, requests: Sequence[str]) -> list[Optional[str]]:
+        """Route a batch of requests in one pass, returning results in request order."""
+        return self.compile().handle_many(requests)
+
+    def compile(self) -> "CompiledChain":
+        """Snapshot the chain starting at this handler into a CompiledChain."""
+        return CompiledChain(self)
+
+    def adaptive(self, reorder_interval: int = 1_000) -> "AdaptiveChain":
+        """Snapshot the chain starting at this handler into an AdaptiveChain."""
+        return AdaptiveChain(self, reorder_interval)
+
+    def cached(self, maxsize: int = 1_024, ttl: Optional[float] = None) -> "CachedChain":
+        """Put a bounded LRU result cache in front of the chain starting at this handler."""
+        return CachedChain(self, maxsize, ttl)
+
+
+def _is_transparent(handler: Handler) -> TypeGuard[AbstractHandler]:
+    """Return True if the handler relies on the default AbstractHandler forwarding."""
+    return isinstance(handler, AbstractHandler) and type(handler).handle is AbstractHandler.handle
+
+
+def _collect(head: Handler) -> tuple[list[AbstractHandler], Optional[Handler]]:
+    """Walk the links from `head`, returning the transparent handlers in order and the opaque tail, if any."""
+    handlers: list[AbstractHandler] = []
+    node: Optional[Handler] = head
+    while node is not None and _is_transparent(node):
+        handlers.append(node)
+        node = node._next_handler  # pylint: disable=protected-access
+    return handlers, node
+
 
 class LowLevelHandler(AbstractHandler):
     """
@@ -78,16 +166,18 @@ class LowLevelHandler(AbstractHandler):
     it passes it to the next handler.
 
     Methods:
-        handle(request: str) -> Optional[str]:
-            Handle "low" level requests or pass the request to the next handler.
+        process(request: str) -> Optional[str]:
+            Handle "low" level requests.
     """
 
-    def handle(self, request: str) -> Optional[str]:
-        """Handle 'low' level requests, or pass it to the next handler."""
+    accepts = frozenset({"low"})
+    order_independent = True
+
+    def process(self, request: str) -> Optional[str]:
+        """Handle 'low' level requests."""
         if request == "low":
             return f"LowLevelHandler: Handling {request}"
-
-        return super().handle(request)
+        return None
 
 
 class MidLevelHandler(AbstractHandler):
@@ -98,15 +188,18 @@ class MidLevelHandler(AbstractHandler):
     it passes it to the next handler.
 
     Methods:
-        handle(request: str) -> Optional[str]:
-            Handle "mid" level requests or pass the request to the next handler.
+        process(request: str) -> Optional[str]:
+            Handle "mid" level requests.
     """
 
-    def handle(self, request: str) -> Optional[str]:
-        """Handle 'mid' level requests, or pass it to the next handler."""
+    accepts = frozenset({"mid"})
+    order_independent = True
+
+    def process(self, request: str) -> Optional[str]:
+        """Handle 'mid' level requests."""
         if request == "mid":
             return f"MidLevelHandler: Handling {request}"
-        return super().handle(request)
+        return None
 
 
 class HighLevelHandler(AbstractHandler):
@@ -117,12 +210,661 @@ class HighLevelHandler(AbstractHandler):
     it passes it to the next handler.
 
     Methods:
-        handle(request: str) -> Optional[str]:
-            Handle "high" level requests or pass the request to the next handler.
+        process(request: str) -> Optional[str]:
+            Handle "high" level requests.
     """
 
-    def handle(self, request: str) -> Optional[str]:
-        """Handle 'high' level requests, or pass it to the next handler."""
+    accepts = frozenset({"high"})
+    order_independent = True
+
+    def process(self, request: str) -> Optional[str]:
+        """Handle 'high' level requests."""
         if request == "high":
             return f"HighLevelHandler: Handling {request}"
-        return super().handle(request)
+        return None
+
+
+class MatchHandler(AbstractHandler):
+    """
+    Match Handler
+
+    Base class for declarative matcher handlers. A matcher handles a request when it matches `pattern`
+    and answers with its label, so routing tables can be built from data rather than subclasses.
+
+    Attributes:
+        pattern (str): The pattern requests are matched against.
+        label (str): Name used in the result, defaulting to the class name and pattern.
+
+    Methods:
+        matches(request: str) -> bool:
+            Return True if the request matches the pattern.
+        process(request: str) -> Optional[str]:
+            Handle matching requests.
+    """
+
+    def __init__(self, pattern: str, label: Optional[str] = None) -> None:
+        self.pattern = pattern
+        self.label = label if label is not None else f"{type(self).__name__}({pattern})"
+
+    @abstractmethod
+    def matches(self, request: str) -> bool:
+        """Return True if the request matches the pattern."""
+
+    def process(self, request: str) -> Optional[str]:
+        """Handle matching requests."""
+        if self.matches(request):
+            return f"{self.label}: Handling {request}"
+        return None
+
+
+class ExactHandler(MatchHandler):
+    """Matcher handler for requests equal to the pattern."""
+
+    def __init__(self, pattern: str, label: Optional[str] = None) -> None:
+        super().__init__(pattern, label)
+        self.accepts = frozenset({pattern})
+
+    def matches(self, request: str) -> bool:
+        """Return True if the request equals the pattern."""
+        return request == self.pattern
+
+
+class PrefixHandler(MatchHandler):
+    """Matcher handler for requests starting with the pattern."""
+
+    def __init__(self, pattern: str, label: Optional[str] = None) -> None:
+        super().__init__(pattern, label)
+        self.accepts_prefixes = frozenset({pattern})
+
+    def matches(self, request: str) -> bool:
+        """Return True if the request starts with the pattern."""
+        return request.startswith(self.pattern)
+
+
+class RegexHandler(MatchHandler):
+    """Matcher handler for requests fully matching a regular expression."""
+
+    def __init__(self, pattern: str, label: Optional[str] = None) -> None:
+        super().__init__(pattern, label)
+        self._regex = re.compile(self._source())
+        self.accepts_regex = self._regex.pattern
+
+    def _source(self) -> str:
+        """Return the regex source for the pattern."""
+        return self.pattern
+
+    def matches(self, request: str) -> bool:
+        """Return True if the request fully matches the regex."""
+        return self._regex.fullmatch(request) is not None
+
+
+class GlobHandler(RegexHandler):
+    """Matcher handler for requests matching a shell-style glob: `*`, `?` and `[...]` classes."""
+
+    def _source(self) -> str:
+        """Translate the glob into a regex."""
+        parts: list[str] = []
+        index = 0
+        pattern = self.pattern
+        while index < len(pattern):
+            char = pattern[index]
+            index += 1
+            if char == "*":
+                parts.append(".*")
+            elif char == "?":
+                parts.append(".")
+            elif char == "[" and (end := self._class_end(pattern, index)) >= 0:
+                body = pattern[index:end].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                elif body.startswith("^"):
+                    body = "\\" + body
+                parts.append(f"[{body}]")
+                index = end + 1
+            else:
+                parts.append(re.escape(char))
+        return "".join(parts)
+
+    @staticmethod
+    def _class_end(pattern: str, start: int) -> int:
+        """
+        Return the index of the `]` closing a class whose body starts at `start`, or -1 if it is unclosed.
+
+        As in `fnmatch`, a `]` right after the opening `[` or `[!` belongs to the body, so `[]]` matches
+        `]` and `[!]` has no closing bracket and stays literal.
+        """
+        if start < len(pattern) and pattern[start] == "!":
+            start += 1
+        if start < len(pattern) and pattern[start] == "]":
+            start += 1
+        return pattern.find("]", start)
+
+
+class _TrieNode:
+    """
+    Prefix trie node.
+
+    Holds the first chain position of a prefix handler whose prefix ends here, and the regexes whose
+    literal prefix ends here, as (position, regex) pairs in chain order.
+    """
+
+    __slots__ = ("children", "position", "patterns")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.position: Optional[int] = None
+        self.patterns: list[tuple[int, re.Pattern[str]]] = []
+
+
+_REGEX_SPECIAL = frozenset(".^$*+?{}[]\\|()")
+
+
+def _regex_class_end(regex: str, start: int) -> int:
+    """Return the index of the `]` closing the character class opened at `start`, or -1 if it is unclosed.
+
+    A leading `^` and a `]` right after it belong to the class, and escapes such as `\\]` are skipped.
+    """
+    index = start + (2 if regex.startswith("^", start + 1) else 1)
+    if regex.startswith("]", index):
+        index += 1
+    while index < len(regex) and regex[index] != "]":
+        index += 2 if regex[index] == "\\" else 1
+    return index if index < len(regex) else -1
+
+
+def _literal_prefix(regex: str) -> str:
+    """Return a literal string every full match of `regex` must start with, possibly empty.
+
+    Reads literal characters and escaped punctuation up to the first other special character. A
+    following `*`, `?` or `{` may make the last literal optional, so it is dropped, and a top-level
+    `|` means no common prefix is known.
+    """
+    depth = 0
+    index = 0
+    while index < len(regex):
+        char = regex[index]
+        if char == "\\":
+            index += 1
+        elif char == "[":
+            index = _regex_class_end(regex, index)
+            if index == -1:
+                return ""
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return ""
+        index += 1
+
+    prefix: list[str] = []
+    index = 0
+    while index < len(regex):
+        char = regex[index]
+        if char == "\\" and index + 1 < len(regex) and not regex[index + 1].isalnum():
+            prefix.append(regex[index + 1])
+            index += 2
+        elif char not in _REGEX_SPECIAL:
+            prefix.append(char)
+            index += 1
+        else:
+            if char in "*?{" and prefix:
+                prefix.pop()
+            break
+    return "".join(prefix)
+
+
+class CompiledChain:
+    """
+    Compiled Chain
+
+    Snapshot of a chain that finds the first declarative match without probing handlers one by one. The
+    `_next_handler` links are walked once: `accepts` go into a request -> position table (O(1) lookup),
+    `accepts_prefixes` into a trie (O(len(request)) lookup) and each `accepts_regex` into the same trie
+    under its literal prefix, so only regexes whose literal prefix the request starts with are tried.
+    The remaining handlers keep their order and are only probed when they sit before the declarative
+    match. A handler that overrides `handle` itself is opaque, so
+    compilation stops there and delegates the rest of the chain to it.
+
+    First-match results are identical to calling `handle` on the head, as long as the links are not
+    changed after compiling.
+
+    Attributes:
+        _handlers (list[AbstractHandler]): Compiled handlers in chain order.
+        _table (dict[str, int]): Exact request to the position of the first handler accepting it.
+        _trie (Optional[_TrieNode]): Trie of prefixes and regex literal prefixes, or None if none are declared.
+        _predicates (list[int]): Positions of handlers that are not declarative.
+        _tail (Optional[Handler]): Opaque handler that takes over the rest of the chain, if any.
+
+    Methods:
+        handle(request: str) -> Optional[str]:
+            Route the request to the first handler in the chain that accepts it.
+        handle_many(requests: Sequence[str]) -> list[Optional[str]]:
+            Route a batch of requests, grouping them by the handler that accepts them.
+    """
+
+    def __init__(self, head: Handler) -> None:
+        self._handlers, self._tail = _collect(head)
+        self._table: dict[str, int] = {}
+        self._trie: Optional[_TrieNode] = None
+        self._predicates: list[int] = []
+
+        for position, handler in enumerate(self._handlers):
+            if not handler.is_declarative():
+                self._predicates.append(position)
+            for key in handler.accepts or ():
+                self._table.setdefault(key, position)
+            for prefix in handler.accepts_prefixes or ():
+                node = self._trie_node(prefix)
+                if node.position is None:
+                    node.position = position
+            if handler.accepts_regex is not None:
+                regex = re.compile(handler.accepts_regex)
+                self._trie_node(_literal_prefix(handler.accepts_regex)).patterns.append((position, regex))
+
+    def _trie_node(self, prefix: str) -> _TrieNode:
+        """Return the trie node for `prefix`, creating the trie and missing nodes."""
+        if self._trie is None:
+            self._trie = _TrieNode()
+        node = self._trie
+        for char in prefix:
+            node = node.children.setdefault(char, _TrieNode())
+        return node
+
+    def _first_match(self, request: str) -> int:
+        """Return the position of the first declarative handler accepting the request, or len(handlers)."""
+        stop = self._table.get(request, len(self._handlers))
+        node = self._trie
+        depth = 0
+        while node is not None:
+            if node.position is not None and node.position < stop:
+                stop = node.position
+            for position, regex in node.patterns:
+                if position >= stop:
+                    break
+                if regex.fullmatch(request) is not None:
+                    stop = position
+                    break
+            if depth == len(request):
+                break
+            node = node.children.get(request[depth])
+            depth += 1
+        return stop
+
+    def __len__(self) -> int:
+        """Return the number of compiled handlers, not counting an opaque tail."""
+        return len(self._handlers)
+
+    def handle(self, request: str) -> Optional[str]:
+        """Route the request to the first handler in the chain that accepts it."""
+        handlers = self._handlers
+        stop = self._first_match(request)
+        for position in self._predicates:
+            if position >= stop:
+                break
+            result = handlers[position].process(request)
+            if result is not None:
+                return result
+        if stop < len(handlers):
+            result = handlers[stop].process(request)
+            if result is not None:
+                return result
+            return self._walk(request, stop + 1)
+        if self._tail is not None:
+            return self._tail.handle(request)
+        return None
+
+    def handle_many(self, requests: Sequence[str]) -> list[Optional[str]]:  # pylint: disable=too-many-locals
+        """Route a batch of requests, grouping them by the handler that accepts them.
+
+        Each handler's `process` is looked up once per batch instead of once per request: predicate
+        handlers are probed in chain order against the requests still pending before their keyed match,
+        then the remaining requests are dispatched in one group per keyed handler.
+        """
+        handlers = self._handlers
+        first_match = self._first_match
+        results: list[Optional[str]] = [None] * len(requests)
+        end = len(handlers)
+        pending = [(index, first_match(request)) for index, request in enumerate(requests)]
+
+        for position in self._predicates:
+            if not pending:
+                break
+            process = handlers[position].process
+            remaining = []
+            for item in pending:
+                index, stop = item
+                if position < stop:
+                    result = process(requests[index])
+                    if result is not None:
+                        results[index] = result
+                        continue
+                remaining.append(item)
+            pending = remaining
+
+        groups: defaultdict[int, list[int]] = defaultdict(list)
+        for index, stop in pending:
+            groups[stop].append(index)
+        unresolved = groups.pop(end, [])
+        for stop, indexes in groups.items():
+            process = handlers[stop].process
+            for index in indexes:
+                result = process(requests[index])
+                if result is None:
+                    result = self._walk(requests[index], stop + 1)
+                results[index] = result
+
+        if self._tail is not None:
+            handle = self._tail.handle
+            for index in unresolved:
+                results[index] = handle(requests[index])
+        return results
+
+    def _walk(self, request: str, start: int) -> Optional[str]:
+        """Probe handlers in order from `start`, then the opaque tail."""
+        for handler in self._handlers[start:]:
+            result = handler.process(request)
+            if result is not None:
+                return result
+        if self._tail is not None:
+            return self._tail.handle(request)
+        return None
+
+
+class AdaptiveChain:
+    """
+    Adaptive Chain
+
+    Snapshot of a chain that counts matches per handler and, every `reorder_interval` requests, moves the
+    most frequently matching handlers towards the front. Only handlers marked `order_independent` are moved,
+    and never across a handler that is not, so the first-match result for every request stays the same.
+    An opaque tail is always probed last.
+
+    Attributes:
+        reorder_interval (int): Number of requests between reorderings.
+        _handlers (list[AbstractHandler]): Handlers in their current probe order.
+        _hits (dict[AbstractHandler, int]): Number of requests each handler has matched.
+        _tail (Optional[Handler]): Opaque handler that takes over the rest of the chain, if any.
+        _requests (int): Number of requests routed.
+        _probes (int): Total number of handlers probed across all requests.
+
+    Methods:
+        handle(request: str) -> Optional[str]:
+            Route the request, counting the match and probe depth.
+        reorder() -> None:
+            Move the hottest order-independent handlers to the front of their segment.
+        hit_counts() -> list[tuple[AbstractHandler, int]]:
+            Return each handler with its match count, in current probe order.
+        average_probe_depth() -> float:
+            Return the average number of handlers probed per request.
+    """
+
+    def __init__(self, head: Handler, reorder_interval: int = 1_000) -> None:
+        if reorder_interval < 1:
+            raise ValueError("reorder_interval must be at least 1")
+        self.reorder_interval = reorder_interval
+        self._handlers, self._tail = _collect(head)
+        self._hits: dict[AbstractHandler, int] = dict.fromkeys(self._handlers, 0)
+        self._requests = 0
+        self._probes = 0
+
+    def __len__(self) -> int:
+        """Return the number of reorderable-chain handlers, not counting an opaque tail."""
+        return len(self._handlers)
+
+    def handle(self, request: str) -> Optional[str]:
+        """Route the request, counting the match and probe depth."""
+        result: Optional[str] = None
+        depth = 0
+        for handler in self._handlers:
+            depth += 1
+            result = handler.process(request)
+            if result is not None:
+                self._hits[handler] += 1
+                break
+        else:
+            if self._tail is not None:
+                result = self._tail.handle(request)
+
+        self._probes += depth
+        self._requests += 1
+        if self._requests % self.reorder_interval == 0:
+            self.reorder()
+        return result
+
+    def reorder(self) -> None:
+        """Move the hottest order-independent handlers to the front of their segment.
+
+        Handlers that are not order-independent stay where they are and split the chain into segments;
+        each segment of order-independent handlers is sorted by match count, keeping ties in place.
+        """
+        ordered: list[AbstractHandler] = []
+        segment: list[AbstractHandler] = []
+        for handler in self._handlers:
+            if handler.order_independent:
+                segment.append(handler)
+                continue
+            ordered.extend(sorted(segment, key=self._hits.__getitem__, reverse=True))
+            ordered.append(handler)
+            segment = []
+        ordered.extend(sorted(segment, key=self._hits.__getitem__, reverse=True))
+        self._handlers = ordered
+
+    def hit_counts(self) -> list[tuple[AbstractHandler, int]]:
+        """Return each handler with its match count, in current probe order."""
+        return [(handler, self._hits[handler]) for handler in self._handlers]
+
+    def average_probe_depth(self) -> float:
+        """Return the average number of handlers probed per request, or 0.0 before any request."""
+        if not self._requests:
+            return 0.0
+        return self._probes / self._requests
+
+
+class CacheStats(NamedTuple):
+    """Counters reported by CachedChain.stats()."""
+
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    size: int
+
+
+class CachedChain:  # pylint: disable=too-many-instance-attributes
+    """
+    Cached Chain
+
+    Memoizes `request -> result` for a chain whose handlers are pure, in a bounded LRU. Misses (including
+    requests no handler accepts) are routed through the head's `handle` and cached.
+
+    Every `set_next` bumps a class-wide generation counter. When it has changed since the last call, the
+    cache re-walks its chain and clears itself only if one of its own links differs, so relinking an
+    unrelated chain costs one walk rather than the whole cache. Links changed without `set_next`, or
+    inside an opaque tail's own chain, are not seen.
+
+    Attributes:
+        maxsize (int): Maximum number of cached requests before the least recently used is evicted.
+        ttl (Optional[float]): Seconds a cached result stays valid, or None to keep it until evicted.
+        _head (AbstractHandler): Head of the cached chain.
+        _entries (OrderedDict[str, tuple[Optional[str], float]]): Request to result and expiry, oldest first.
+        _generation (int): AbstractHandler generation the link snapshot was taken at.
+        _links (list[Handler]): Snapshot of the handlers in the chain, in link order.
+
+    Methods:
+        handle(request: str) -> Optional[str]:
+            Return the cached result for the request, routing it through the chain on a miss.
+        clear() -> None:
+            Drop every cached result.
+        stats() -> CacheStats:
+            Return hit, miss, eviction and invalidation counters and the current size.
+    """
+
+    def __init__(self, head: AbstractHandler, maxsize: int = 1_024, ttl: Optional[float] = None) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._head = head
+        self._entries: OrderedDict[str, tuple[Optional[str], float]] = OrderedDict()
+        self._generation = AbstractHandler._generation  # pylint: disable=protected-access
+        self._links = self._snapshot()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached requests."""
+        return len(self._entries)
+
+    def handle(self, request: str) -> Optional[str]:
+        """Return the cached result for the request, routing it through the chain on a miss."""
+        if self._generation != AbstractHandler._generation:  # pylint: disable=protected-access
+            self._revalidate()
+
+        entries = self._entries
+        entry = entries.get(request)
+        if entry is not None:
+            result, expires_at = entry
+            if self.ttl is None or time.monotonic() < expires_at:
+                entries.move_to_end(request)
+                self._hits += 1
+                return result
+            del entries[request]
+
+        self._misses += 1
+        result = self._head.handle(request)
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else 0.0
+        entries[request] = (result, expires_at)
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+            self._evictions += 1
+        return result
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        """Return hit, miss, eviction and invalidation counters and the current size."""
+        return CacheStats(self._hits, self._misses, self._evictions, self._invalidations, len(self._entries))
+
+    def _snapshot(self) -> list[Handler]:
+        """Return the handlers reachable from the head, in link order, stopping at an opaque tail."""
+        handlers, tail = _collect(self._head)
+        links: list[Handler] = list(handlers)
+        if tail is not None:
+            links.append(tail)
+        return links
+
+    def _revalidate(self) -> None:
+        """Clear the cache if any link in this chain changed since the last snapshot."""
+        self._generation = AbstractHandler._generation  # pylint: disable=protected-access
+        links = self._snapshot()
+        if len(links) != len(self._links) or any(new is not old for new, old in zip(links, self._links)):
+            self._links = links
+            if self._entries:
+                self._entries.clear()
+                self._invalidations += 1
+
+
+class AsyncHandler(ABC):
+    """
+    Async Handler
+
+    The asyncio counterpart of Handler, for handlers that call I/O-bound backends.
+
+    Methods:
+        set_next(handler: Union['AsyncHandler', Handler]) -> Union['AsyncHandler', Handler]:
+            Set the next handler in the chain.
+        handle(request: str) -> Optional[str]:
+            Process the request or pass it to the next handler.
+    """
+
+    @abstractmethod
+    def set_next(self, handler: Union["AsyncHandler", Handler]) -> Union["AsyncHandler", Handler]:
+        """Set the next handler in the chain."""
+
+    @abstractmethod
+    async def handle(self, request: str) -> Optional[str]:
+        """Handle the request or pass it to the next handler in the chain."""
+
+
+class AsyncAbstractHandler(AsyncHandler):
+    """
+    Async Abstract Handler Implementation
+
+    Provides the same linking semantics as AbstractHandler for coroutines. Subclasses put their own logic in
+    `async def process`. Sync handlers may be linked into the chain: their blocking calls run on `executor`
+    (the event loop's default executor when None) so they do not stall the loop.
+
+    Attributes:
+        executor (Optional[Executor]): Executor for sync handlers reached from this head, or None for the default.
+        _next_handler (Optional[Union[AsyncHandler, Handler]]): The next handler in the chain, or None.
+
+    Methods:
+        set_next(handler: Union[AsyncHandler, Handler]) -> Union[AsyncHandler, Handler]:
+            Set the next handler in the chain and return the handler.
+        process(request: str) -> Optional[str]:
+            Process the request without forwarding it.
+        handle(request: str) -> Optional[str]:
+            Process the request or pass it to the next handler.
+        handle_batch(requests: Sequence[str], concurrency: int) -> list[Optional[str]]:
+            Route many requests concurrently, with at most `concurrency` in flight.
+    """
+
+    executor: Optional[Executor] = None
+    _next_handler: Optional[Union[AsyncHandler, Handler]] = None
+
+    def set_next(self, handler: Union[AsyncHandler, Handler]) -> Union[AsyncHandler, Handler]:
+        """Set the next handler in the chain."""
+        self._next_handler = handler
+        return handler
+
+    async def process(self, request: str) -> Optional[str]:  # pylint: disable=unused-argument
+        """Process the request without forwarding it; return None if this handler does not accept it."""
+        return None
+
+    async def handle(self, request: str) -> Optional[str]:
+        """Process the request or pass it to the next handler in the chain.
+
+        Like AbstractHandler.handle, the chain is walked in a loop. Async handlers that override `handle`
+        are awaited and sync handlers that override it run on the executor; either takes over the rest
+        of the chain.
+        """
+        loop = asyncio.get_running_loop()
+        result = await self.process(request)
+        node = self._next_handler
+        while result is None and node is not None:
+            if isinstance(node, AsyncAbstractHandler) and type(node).handle is AsyncAbstractHandler.handle:
+                result = await node.process(request)
+                node = node._next_handler  # pylint: disable=protected-access
+            elif isinstance(node, AsyncHandler):
+                return await node.handle(request)
+            elif _is_transparent(node):
+                result = await loop.run_in_executor(self.executor, node.process, request)
+                node = node._next_handler  # pylint: disable=protected-access
+            else:
+                return await loop.run_in_executor(self.executor, node.handle, request)
+        return result
+
+    async def handle_batch(self, requests: Sequence[str], concurrency: int = 10) -> list[Optional[str]]:
+        """Route many requests concurrently, returning results in request order.
+
+        A fixed pool of `concurrency` workers pulls requests from a shared cursor, which bounds the number
+        in flight like a semaphore would without creating one task per request.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        results: list[Optional[str]] = [None] * len(requests)
+        cursor: Iterator[int] = iter(range(len(requests)))
+
+        async def worker() -> None:
+            for index in cursor:
+                results[index] = await self.handle(requests[index])
+
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(requests)))))
+        return results
@@ -1,22 +1,64 @@
 """Module for demonstrating the Command Pattern in an online order system."""
 
+import hashlib
+import io
+import math
+import os
+import pickle
+import queue
+import struct
+import sys
+import tempfile
+import threading
+import time
 from abc import ABC, abstractmethod
+from array import array
+from collections import deque
+from collections.abc import MutableSequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import IO, Any, Callable, Hashable, Iterable, Iterator, NamedTuple, Optional, Protocol, Union, overload
 
 
 class Order:
     """Represents an order in the online system."""
 
+    _last_id = 0
+    _id_lock = threading.Lock()
+
+    def __init__(self, order_id: Optional[int] = None) -> None:
+        """Initialize the order with an id, assigning one above every id seen so far if none is given."""
+        with Order._id_lock:
+            if order_id is None:
+                order_id = Order._last_id + 1
+            Order._last_id = max(Order._last_id, order_id)
+        self.order_id: int = order_id
+        self.status = "new"
+
+    @classmethod
+    def reserve_ids(cls, order_id: int) -> None:
+        """Make sure ids assigned from now on are above `order_id`."""
+        with cls._id_lock:
+            cls._last_id = max(cls._last_id, order_id)
+
     def place(self) -> None:
         """Place the order."""
+        self.status = "placed"
         print("Order has been placed.")
 
     def cancel(self) -> None:
         """Cancel the order."""
+        self.status = "canceled"
         print("Order has been canceled.")
 
 
 class Command(ABC):
-    """Command interface for executing commands."""
+    """Command interface for executing commands.
+
+    A command may carry an `idempotency_key` chosen by the client, so that retried requests producing
+    the same command can be recognised and dropped by an `IdempotencyFilter`.
+    """
+
+    idempotency_key: Optional[str] = None
 
     @abstractmethod
     def execute(self) -> None:
@@ -26,12 +68,30 @@ class Command(ABC):
     def undo(self) -> None:
         """Undo the command."""
 
+    def coalesce_key(self) -> Optional[Hashable]:
+        """Return the key of the state this command acts on, or None if it never coalesces."""
+        return None
 
-class PlaceOrderCommand(Command):
-    """Command to place an order."""
+    def cancels(self, previous: "Command") -> bool:  # pylint: disable=unused-argument
+        """Return True if running this command right after `previous`, on the same key, undoes it."""
+        return False
+
+
+class OrderCommand(Command, ABC):
+    """Base class for commands acting on a single order."""
 
-    def __init__(self, order: Order) -> None:
+    def __init__(self, order: Order, idempotency_key: Optional[str] = None) -> None:
         self.order = order
+        if idempotency_key is not None:
+            self.idempotency_key = idempotency_key
+
+    def coalesce_key(self) -> Optional[Hashable]:
+        """Return the order this command acts on."""
+        return self.order
+
+
+class PlaceOrderCommand(OrderCommand):
+    """Command to place an order."""
 
     def execute(self) -> None:
         """Place the order."""
@@ -42,12 +102,9 @@ class PlaceOrderCommand(Command):
         self.order.cancel()
 
 
-class CancelOrderCommand(Command):
+class CancelOrderCommand(OrderCommand):
     """Command to cancel an order."""
 
-    def __init__(self, order: Order) -> None:
-        self.order = order
-
     def execute(self) -> None:
         """Cancel the order."""
         self.order.cancel()
@@ -56,27 +113,887 @@ class CancelOrderCommand(Command):
         """Undo the cancel order action by placing the order."""
         self.order.place()
 
+    def cancels(self, previous: Command) -> bool:
+        """Canceling right after placing the same order undoes the placement."""
+        return isinstance(previous, PlaceOrderCommand) and previous.order is self.order
+
+
+def coalesce(commands: Iterable[Command]) -> list[Command]:
+    """Drop contradictory pairs from commands given in execution order.
+
+    A command that `cancels` the latest surviving command with the same `coalesce_key` removes both, so
+    nested pairs such as place, place, cancel, cancel collapse completely. Commands on other keys in
+    between do not prevent coalescing.
+    """
+    survivors: list[Optional[Command]] = []
+    pending: dict[Hashable, list[int]] = {}
+    for command in commands:
+        key = command.coalesce_key()
+        if key is None:
+            survivors.append(command)
+            continue
+        stack = pending.setdefault(key, [])
+        if stack:
+            previous = survivors[stack[-1]]
+            if previous is not None and command.cancels(previous):
+                survivors[stack.pop()] = None
+                continue
+        stack.append(len(survivors))
+        survivors.append(command)
+    return [command for command in survivors if command is not None]
+
+
+class MacroCommand(Command):
+    """Command that runs a sequence of commands as one, undoing them in reverse order."""
+
+    def __init__(self, commands: Iterable[Command], coalesced: bool = True) -> None:
+        self.commands: list[Command] = coalesce(commands) if coalesced else list(commands)
+
+    def execute(self) -> None:
+        """Execute every command in order."""
+        for command in self.commands:
+            command.execute()
+
+    def undo(self) -> None:
+        """Undo every command in reverse order."""
+        for command in reversed(self.commands):
+            command.undo()
+
+
+OPCODE_COMMANDS: dict[int, type[OrderCommand]] = {1: PlaceOrderCommand, 2: CancelOrderCommand}
+"""Order command class for each opcode, used for compact encodings of commands."""
+
+COMMAND_OPCODES: dict[type[OrderCommand], int] = {
+    command_type: opcode for opcode, command_type in OPCODE_COMMANDS.items()
+}
+"""Opcode of each order command class."""
+
+
+def register_opcode(opcode: int, command_type: type[OrderCommand]) -> None:
+    """Register an order command class under a one-byte opcode for compact encodings."""
+    if not 0 < opcode < 256:
+        raise ValueError("opcode must be between 1 and 255")
+    if OPCODE_COMMANDS.get(opcode, command_type) is not command_type:
+        raise ValueError(f"opcode {opcode} is already registered for {OPCODE_COMMANDS[opcode].__name__}")
+    OPCODE_COMMANDS[opcode] = command_type
+    COMMAND_OPCODES[command_type] = opcode
+
+
+class CompactCommandStore(MutableSequence[Command]):
+    """
+    Sequence of order commands stored as fixed-width records.
+
+    Each command takes one byte of opcode (see `register_opcode`) and eight bytes of order id in two
+    parallel arrays, instead of a full object per command. Commands are materialized from their record
+    only when read, for instance when `OrderInvoker.press_button` pops one to execute it, so reading
+    the same position twice gives equal but distinct objects. Orders are shared and reference-counted:
+    the store holds each distinct `Order` until its last record goes, so materialized commands act on the
+    live order, and the saving shrinks as commands spread over more orders (see `bench_command.py`).
+    A different `Order` object with an id already in the store raises ValueError. Idempotency keys are
+    not stored. It can back `OrderInvoker.commands` and `OrderInvoker.history`.
+    """
+
+    def __init__(self, commands: Iterable[Command] = ()) -> None:
+        self._opcodes = array("B")
+        self._order_ids = array("Q")
+        self._orders: dict[int, Order] = {}
+        self._references: dict[int, int] = {}
+        self.extend(commands)
+
+    def __len__(self) -> int:
+        """Return the number of stored commands."""
+        return len(self._opcodes)
+
+    @overload
+    def __getitem__(self, index: int) -> Command: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Command]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Command, list[Command]]:
+        """Materialize the command, or list of commands, at `index`."""
+        if isinstance(index, slice):
+            return [self._materialize(position) for position in range(*index.indices(len(self)))]
+        return self._materialize(index)
+
+    @overload
+    def __setitem__(self, index: int, value: Command) -> None: ...
+
+    @overload
+    def __setitem__(self, index: slice, value: Iterable[Command]) -> None: ...
+
+    def __setitem__(self, index: Union[int, slice], value: Union[Command, Iterable[Command]]) -> None:
+        """Replace the command at `index`; slice assignment is not supported."""
+        if isinstance(index, slice) or not isinstance(value, Command):
+            raise TypeError("CompactCommandStore only supports assigning single commands")
+        replaced = self._order_ids[index]
+        self._opcodes[index], self._order_ids[index] = self._encode(value)
+        self._release(replaced)
+
+    def __delitem__(self, index: Union[int, slice]) -> None:
+        """Delete the record, or records, at `index`."""
+        removed = self._order_ids[index] if isinstance(index, slice) else [self._order_ids[index]]
+        del self._opcodes[index]
+        del self._order_ids[index]
+        for order_id in removed:
+            self._release(order_id)
+
+    def insert(self, index: int, value: Command) -> None:
+        """Insert a command before `index`."""
+        opcode, order_id = self._encode(value)
+        self._opcodes.insert(index, opcode)
+        self._order_ids.insert(index, order_id)
+
+    def append(self, value: Command) -> None:
+        """Append a command."""
+        opcode, order_id = self._encode(value)
+        self._opcodes.append(opcode)
+        self._order_ids.append(order_id)
+
+    def pop(self, index: int = -1) -> Command:
+        """Remove and return the command at `index`, the last one by default."""
+        command = self._materialize(index)
+        del self[index]
+        return command
+
+    def clear(self) -> None:
+        """Remove every command and release the order references."""
+        del self._opcodes[:]
+        del self._order_ids[:]
+        self._orders.clear()
+        self._references.clear()
+
+    def nbytes(self) -> int:
+        """Return the bytes used by the record arrays."""
+        return len(self) * (self._opcodes.itemsize + self._order_ids.itemsize)
+
+    def _encode(self, command: Command) -> tuple[int, int]:
+        """Return the (opcode, order id) record for a registered order command."""
+        if not isinstance(command, OrderCommand) or type(command) not in COMMAND_OPCODES:
+            raise TypeError(f"{type(command).__name__} has no registered opcode")
+        order = command.order
+        if self._orders.setdefault(order.order_id, order) is not order:
+            raise ValueError(f"another Order with id {order.order_id} is already in the store")
+        self._references[order.order_id] = self._references.get(order.order_id, 0) + 1
+        return COMMAND_OPCODES[type(command)], order.order_id
+
+    def _release(self, order_id: int) -> None:
+        """Drop one record's reference to an order, forgetting the order with its last record."""
+        self._references[order_id] -= 1
+        if not self._references[order_id]:
+            del self._references[order_id], self._orders[order_id]
+
+    def _materialize(self, index: int) -> Command:
+        """Build the command object for the record at `index`."""
+        return OPCODE_COMMANDS[self._opcodes[index]](self._orders[self._order_ids[index]])
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Sized for `capacity` keys at `false_positive_rate`: `add` and `__contains__` cost a fixed number of
+    bit probes, and membership tests never give false negatives.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("false_positive_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self.size = max(8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def __contains__(self, key: str) -> bool:
+        """Return True if the key may have been added, False if it certainly was not."""
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def add(self, key: str) -> None:
+        """Add a key."""
+        bits = self._bits
+        for position in self._positions(key):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def nbytes(self) -> int:
+        """Return the size of the bit array in bytes."""
+        return len(self._bits)
+
+    def current_false_positive_rate(self) -> float:
+        """Return the expected false-positive rate for the keys added so far."""
+        return float((1 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes)
+
+    def _positions(self, key: str) -> Iterator[int]:
+        """Yield the bit positions of a key, by double hashing one 128-bit digest."""
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for index in range(self.hashes):
+            yield (first + index * second) % self.size
+
+
+class DedupStats(NamedTuple):
+    """Counters reported by IdempotencyFilter.stats()."""
+
+    checks: int
+    duplicates: int
+    uncertain: int
+    false_positive_rate: float
+    bloom_bytes: int
+    exact_keys: int
+
+
+class IdempotencyFilter:  # pylint: disable=too-many-instance-attributes
+    """
+    Recognises repeated idempotency keys in constant time and bounded memory.
+
+    The exact set remembers the last `exact_capacity` keys; a pair of rotating Bloom filter generations,
+    each sized for `capacity` keys at `false_positive_rate`, remembers at least the last `capacity`.
+    A key the Bloom front has never seen is new without consulting the exact set; a key in the exact
+    set is a duplicate. A key the Bloom front reports but the exact set does not know is either a false
+    positive or a duplicate older than the exact window: it is counted as uncertain and, unless
+    `reject_uncertain` is set, let through.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1_000_000,
+        false_positive_rate: float = 0.001,
+        exact_capacity: int = 100_000,
+        reject_uncertain: bool = False,
+    ) -> None:
+        if not 1 <= exact_capacity <= capacity:
+            raise ValueError("exact_capacity must be between 1 and capacity")
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self.exact_capacity = exact_capacity
+        self.reject_uncertain = reject_uncertain
+        self._current = BloomFilter(capacity, false_positive_rate)
+        self._previous: Optional[BloomFilter] = None
+        self._exact: dict[str, None] = {}
+        self._checks = 0
+        self._duplicates = 0
+        self._uncertain = 0
+
+    def seen(self, key: str) -> bool:
+        """Record the key and return True if it is a duplicate that should be dropped."""
+        self._checks += 1
+        exact = self._exact
+        if key in self._current or (self._previous is not None and key in self._previous):
+            if key in exact:
+                self._duplicates += 1
+                return True
+            self._uncertain += 1
+            if self.reject_uncertain:
+                self._duplicates += 1
+                return True
+
+        if self._current.count >= self.capacity:
+            self._previous, self._current = self._current, BloomFilter(self.capacity, self.false_positive_rate)
+        self._current.add(key)
+        exact[key] = None
+        if len(exact) > self.exact_capacity:
+            del exact[next(iter(exact))]
+        return False
+
+    def stats(self) -> DedupStats:
+        """Return check, duplicate and uncertain counts, the expected false-positive rate and memory use."""
+        bloom_bytes = self._current.nbytes() + (self._previous.nbytes() if self._previous is not None else 0)
+        rate = self._current.current_false_positive_rate()
+        if self._previous is not None:
+            rate = 1 - (1 - rate) * (1 - self._previous.current_false_positive_rate())
+        return DedupStats(self._checks, self._duplicates, self._uncertain, rate, bloom_bytes, len(self._exact))
+
+
+class HistoryStats(NamedTuple):
+    """Counters reported by CommandHistory.stats()."""
+
+    entries: int
+    in_memory: int
+    spilled: int
+    memory_bytes: int
+    disk_bytes: int
+    dropped: int
+
+
+class _ReceiverPickler(pickle.Pickler):
+    """Pickler that stores commands by value and the objects they act on by reference."""
+
+    def __init__(self, file: IO[bytes]) -> None:
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.receivers: dict[int, Any] = {}
+
+    def persistent_id(self, obj: Any) -> Optional[int]:
+        """Return a reference for receivers, collected in `receivers`; commands and builtins go by value."""
+        if isinstance(obj, (Command, type)) or type(obj).__module__ == "builtins":
+            return None
+        self.receivers[id(obj)] = obj
+        return id(obj)
+
+
+class _ReceiverUnpickler(pickle.Unpickler):
+    """Unpickler resolving receiver references written by _ReceiverPickler."""
+
+    def __init__(self, file: IO[bytes], receivers: dict[int, Any]) -> None:
+        super().__init__(file)
+        self._receivers = receivers
+
+    def persistent_load(self, pid: Any) -> Any:
+        """Return the live receiver for a reference."""
+        return self._receivers[pid]
+
+
+class CommandHistory:  # pylint: disable=too-many-instance-attributes
+    """
+    Undo history with an optional depth limit and memory budget.
+
+    Behaves as a stack of executed commands. With `max_depth` it is a ring buffer: the oldest entry is
+    dropped once the depth is exceeded. With `max_bytes`, the oldest in-memory entries are pickled to an
+    append-only segment file (`spill_path`, or an anonymous temporary file) whenever their estimated
+    size exceeds the budget, and are read back one at a time as `pop` reaches them. An entry that cannot
+    be pickled stays in memory and `append` raises the pickling error.
+
+    Spilled commands keep references to the objects they act on (such as an `Order`) rather than copies,
+    so undoing a spilled command still acts on the live object. Each object is reference-counted by the
+    spilled entries that mention it and released once the last of them is popped or dropped. Entries
+    dropped off the front of the segment leave dead bytes behind; the segment is compacted once they
+    outweigh the live entries, so its size stays within about twice the spilled data. Sizes are shallow
+    `sys.getsizeof` estimates of each command and its attributes.
+    """
+
+    _RECORD = struct.Struct("<I")
+    _COPY_CHUNK = 2**20
+
+    def __init__(
+        self, max_depth: Optional[int] = None, max_bytes: Optional[int] = None, spill_path: Optional[str] = None
+    ) -> None:
+        if max_depth is not None and max_depth < 1:
+            raise ValueError("max_depth must be at least 1")
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+        self.max_depth = max_depth
+        self.max_bytes = max_bytes
+        self.spill_path = spill_path
+        self._memory: deque[tuple[Command, int]] = deque()
+        self._memory_bytes = 0
+        self._spilled: deque[tuple[int, tuple[int, ...]]] = deque()
+        self._segment: Optional[IO[bytes]] = None
+        self._receivers: dict[int, Any] = {}
+        self._refcounts: dict[int, int] = {}
+        self._dropped = 0
+
+    def __len__(self) -> int:
+        """Return the number of commands in the history, in memory and spilled."""
+        return len(self._memory) + len(self._spilled)
+
+    def __iter__(self) -> Iterator[Command]:
+        """Iterate from the oldest command to the newest, reading spilled entries from disk."""
+        for offset, _ in list(self._spilled):
+            yield self._read(offset)
+        for command, _ in list(self._memory):
+            yield command
+
+    def append(self, command: Command) -> None:
+        """Push an executed command, dropping or spilling the oldest entries to honour the limits."""
+        size = sys.getsizeof(command) + sys.getsizeof(getattr(command, "__dict__", None))
+        self._memory.append((command, size))
+        self._memory_bytes += size
+        if self.max_depth is not None and len(self) > self.max_depth:
+            self._drop_oldest()
+        if self.max_bytes is not None:
+            while self._memory_bytes > self.max_bytes and self._memory:
+                self._spill_oldest()
+
+    def pop(self) -> Command:
+        """Remove and return the most recent command, reading it back from disk if it was spilled."""
+        if self._memory:
+            command, size = self._memory.pop()
+            self._memory_bytes -= size
+            return command
+        if self._spilled:
+            return self._load_newest()
+        raise IndexError("pop from empty history")
+
+    def stats(self) -> HistoryStats:
+        """Return entry counts, estimated memory use and segment file size."""
+        disk_bytes = 0
+        if self._segment is not None:
+            disk_bytes = self._segment.seek(0, io.SEEK_END)
+        return HistoryStats(
+            len(self), len(self._memory), len(self._spilled), self._memory_bytes, disk_bytes, self._dropped
+        )
+
+    def close(self) -> None:
+        """Close the segment file, discarding spilled entries."""
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+        self._spilled.clear()
+        self._receivers.clear()
+        self._refcounts.clear()
+
+    def _drop_oldest(self) -> None:
+        """Discard the oldest entry, which lives on disk if anything has been spilled."""
+        self._dropped += 1
+        if self._spilled:
+            _, references = self._spilled.popleft()
+            self._release(references)
+            if not self._spilled:
+                self._reset_segment()
+            elif self._spilled[0][0] > self._segment_file().seek(0, io.SEEK_END) - self._spilled[0][0]:
+                self._compact()
+        else:
+            _, size = self._memory.popleft()
+            self._memory_bytes -= size
+
+    def _spill_oldest(self) -> None:
+        """Append the oldest in-memory entry to the segment file; it stays in memory if that fails."""
+        command, size = self._memory[0]
+        buffer = io.BytesIO()
+        pickler = _ReceiverPickler(buffer)
+        pickler.dump(command)
+        payload = buffer.getvalue()
+        segment = self._segment_file()
+        offset = segment.seek(0, io.SEEK_END)
+        try:
+            segment.write(self._RECORD.pack(len(payload)) + payload)
+        except OSError:
+            segment.truncate(offset)
+            raise
+        self._memory.popleft()
+        self._memory_bytes -= size
+        self._receivers.update(pickler.receivers)
+        for reference in pickler.receivers:
+            self._refcounts[reference] = self._refcounts.get(reference, 0) + 1
+        self._spilled.append((offset, tuple(pickler.receivers)))
+
+    def _load_newest(self) -> Command:
+        """Read the newest spilled entry back and truncate it off the segment file."""
+        offset, references = self._spilled.pop()
+        command = self._read(offset)
+        self._release(references)
+        self._segment_file().truncate(offset)
+        if not self._spilled:
+            self._reset_segment()
+        return command
+
+    def _release(self, references: tuple[int, ...]) -> None:
+        """Drop one reference to each receiver, forgetting receivers no spilled entry mentions any more."""
+        for reference in references:
+            self._refcounts[reference] -= 1
+            if not self._refcounts[reference]:
+                del self._refcounts[reference]
+                del self._receivers[reference]
+
+    def _compact(self) -> None:
+        """Move the live entries to the start of the segment file, discarding the dropped ones before them."""
+        segment = self._segment_file()
+        head = self._spilled[0][0]
+        end = segment.seek(0, io.SEEK_END)
+        for position in range(head, end, self._COPY_CHUNK):
+            segment.seek(position)
+            chunk = segment.read(self._COPY_CHUNK)
+            segment.seek(position - head)
+            segment.write(chunk)
+        segment.truncate(end - head)
+        self._spilled = deque((offset - head, references) for offset, references in self._spilled)
+
+    def _read(self, offset: int) -> Command:
+        """Read the spilled command stored at `offset`."""
+        segment = self._segment_file()
+        segment.seek(offset)
+        (length,) = self._RECORD.unpack(segment.read(self._RECORD.size))
+        command: Command = _ReceiverUnpickler(io.BytesIO(segment.read(length)), self._receivers).load()
+        return command
+
+    def _segment_file(self) -> IO[bytes]:
+        """Return the segment file, opening it on first use."""
+        if self._segment is None:
+            if self.spill_path:
+                self._segment = open(self.spill_path, "w+b")  # pylint: disable=consider-using-with
+            else:
+                self._segment = tempfile.TemporaryFile()  # pylint: disable=consider-using-with
+        return self._segment
+
+    def _reset_segment(self) -> None:
+        """Empty the segment file and release receiver references once nothing is spilled."""
+        if self._segment is not None:
+            self._segment.truncate(0)
+        self._receivers.clear()
+        self._refcounts.clear()
+
+
+class JournalStats(NamedTuple):
+    """Counters reported by CommandJournal.stats()."""
+
+    records: int
+    commits: int
+
+
+class CommandJournal:  # pylint: disable=too-many-instance-attributes
+    """
+    Append-only journal of executed and undone order commands, with group commit.
+
+    Each entry is a fixed-width record: an execute/undo flag, the command's opcode from `COMMAND_OPCODES`
+    and its order id. Records are appended once the command has run, so replay never re-runs a command
+    that failed. A background writer collects the records appended within `commit_window` seconds (or
+    up to `max_batch` of them) and makes them durable with a single write and fsync; `append` returns a
+    future resolved once its record is durable, so callers choose whether to wait. The first write error
+    is kept and raised by every later `flush` and by `close`, so lost records are never silent.
+
+    Opening a journal truncates a partially written trailing record left by a crash, so new records
+    start on a record boundary.
+    """
+
+    EXECUTE = 0
+    UNDO = 1
+    _RECORD = struct.Struct("<BBQ")
+
+    def __init__(self, path: str, commit_window: float = 0.005, max_batch: int = 4_096) -> None:
+        if commit_window < 0:
+            raise ValueError("commit_window must not be negative")
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self.path = path
+        self.commit_window = commit_window
+        self.max_batch = max_batch
+        self._file = open(path, "ab")  # pylint: disable=consider-using-with
+        size = self._file.seek(0, io.SEEK_END)
+        if size % self._RECORD.size:
+            self._file.truncate(size - size % self._RECORD.size)
+        self._condition = threading.Condition()
+        self._pending: list[bytes] = []
+        self._futures: list[Future[None]] = []
+        self._last_future: Optional[Future[None]] = None
+        self._first_at = 0.0
+        self._closed = False
+        self._error: Optional[OSError] = None
+        self._records = 0
+        self._commits = 0
+        self._writer = threading.Thread(target=self._write_loop, name="CommandJournal", daemon=True)
+        self._writer.start()
+
+    def __enter__(self) -> "CommandJournal":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def append(self, command: Command, undo: bool = False) -> "Future[None]":
+        """Queue a record for an executed (or undone) command; the future resolves once it is durable."""
+        order_command = self.check(command)
+        kind = self.UNDO if undo else self.EXECUTE
+        record = self._RECORD.pack(kind, COMMAND_OPCODES[type(order_command)], order_command.order.order_id)
+        future: Future[None] = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("journal is closed")
+            if not self._pending:
+                self._first_at = time.monotonic()
+            self._pending.append(record)
+            self._futures.append(future)
+            self._last_future = future
+            if len(self._pending) in (1, self.max_batch):
+                self._condition.notify()
+        return future
+
+    @staticmethod
+    def check(command: Command) -> OrderCommand:
+        """Return the command if it has a journal opcode, else raise TypeError; lets callers check before running."""
+        if not isinstance(command, OrderCommand) or type(command) not in COMMAND_OPCODES:
+            raise TypeError(f"{type(command).__name__} has no journal opcode")
+        return command
+
+    def flush(self) -> None:
+        """Block until every record appended so far is durable; raise the first write error if any failed."""
+        with self._condition:
+            # The newest record may already be in the writer's hands; its future resolves once it is durable.
+            future = self._last_future
+            # Backdate the batch so the writer commits without waiting out the window.
+            self._first_at = 0.0
+            self._condition.notify()
+        if future is not None:
+            future.exception()
+        self._raise_error()
+
+    def stats(self) -> JournalStats:
+        """Return the number of durable records and of group commits (fsyncs)."""
+        with self._condition:
+            return JournalStats(self._records, self._commits)
+
+    def close(self) -> None:
+        """Commit outstanding records and close the file; raise the first write error if any failed."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._writer.join()
+        self._file.close()
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        """Raise the first write error, if a batch has failed."""
+        if self._error is not None:
+            raise self._error
+
+    def _write_loop(self) -> None:
+        """Commit batches until closed: wait for a first record, then for the window or a full batch."""
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                while self._pending and not self._closed and len(self._pending) < self.max_batch:
+                    remaining = self._first_at + self.commit_window - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if not self._pending and self._closed:
+                    return
+                records, self._pending = self._pending, []
+                futures, self._futures = self._futures, []
+            try:
+                self._file.write(b"".join(records))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except OSError as error:
+                with self._condition:
+                    if self._error is None:
+                        self._error = error
+                for future in futures:
+                    future.set_exception(error)
+                continue
+            with self._condition:
+                self._records += len(records)
+                self._commits += 1
+            for future in futures:
+                future.set_result(None)
+
+    @classmethod
+    def replay(
+        cls,
+        path: str,
+        invoker: Optional["OrderInvoker"] = None,
+        order_factory: Callable[[int], Order] = Order,
+    ) -> dict[int, Order]:
+        """Rebuild orders, and optionally an invoker's history, by re-running the journal.
+
+        Execute records run the command and push it on the invoker's history; undo records pop and undo
+        the newest history entry. Nothing is journaled while replaying. A partially written trailing
+        record from a crash is ignored. Returns the orders by id.
+        """
+        orders: dict[int, Order] = {}
+        invoker = invoker if invoker is not None else OrderInvoker()
+        with open(path, "rb") as file:
+            data = file.read()
+        usable = len(data) - len(data) % cls._RECORD.size
+        for kind, opcode, order_id in cls._RECORD.iter_unpack(data[:usable]):
+            if kind == cls.UNDO:
+                invoker.history.pop().undo()
+                continue
+            order = orders.get(order_id)
+            if order is None:
+                order = orders[order_id] = order_factory(order_id)
+            command = OPCODE_COMMANDS[opcode](order)
+            command.execute()
+            invoker.history.append(command)
+        if orders:
+            # New orders must not reuse a journaled id, whatever order_factory did.
+            Order.reserve_ids(max(orders))
+        return orders
+
+
+class CommandStack(Protocol):
+    """Stack of commands usable as `OrderInvoker.history`."""
+
+    def __len__(self) -> int:
+        """Return the number of commands."""
+
+    def __iter__(self) -> Iterator[Command]:
+        """Iterate from the oldest command to the newest."""
+
+    def append(self, command: Command, /) -> None:
+        """Push a command."""
+
+    def pop(self) -> Command:
+        """Remove and return the newest command."""
+
 
 class OrderInvoker:
-    """Invoker that triggers the commands."""
+    """Invoker that triggers the commands.
 
-    def __init__(self) -> None:
-        self.commands: list[Command] = []
-        self.history: list[Command] = []
+    `commands` and `history` default to lists. Pass a CommandHistory as `history` to bound it by depth
+    or memory, or a CompactCommandStore for either to hold millions of commands compactly. With `dedup`, commands whose
+    idempotency key was already seen are dropped by `set_command`.
 
-    def set_command(self, command: Command) -> None:
-        """Set a command to be executed."""
+    With a `journal`, every executed and undone command is also appended to it, so the history and the
+    orders can be rebuilt with `CommandJournal.replay`. Journal records are group-committed in the
+    background; call `journal.flush()` to wait for durability.
+    """
+
+    def __init__(
+        self,
+        history: Optional[CommandStack] = None,
+        journal: Optional[CommandJournal] = None,
+        commands: Optional[MutableSequence[Command]] = None,
+        dedup: Optional[IdempotencyFilter] = None,
+    ) -> None:
+        self.commands: MutableSequence[Command] = commands if commands is not None else []
+        self.history: CommandStack = history if history is not None else []
+        self.journal = journal
+        self.dedup = dedup
+
+    def set_command(self, command: Command) -> bool:
+        """Set a command to be executed.
+
+        Returns False, without queueing it, if the invoker has a `dedup` filter and the command's
+        idempotency key has been seen before.
+        """
+        key = command.idempotency_key
+        if key is not None and self.dedup is not None and self.dedup.seen(key):
+            return False
         self.commands.append(command)
+        return True
 
     def press_button(self) -> None:
-        """Execute the last command set."""
+        """Execute the last command set.
+
+        With a journal, a command it cannot record raises TypeError and stays queued, unexecuted.
+        """
         if self.commands:
+            if self.journal is not None:
+                self.journal.check(self.commands[-1])
             command = self.commands.pop()
             command.execute()
-            self.history.append(command)
+            self._record(command)
+
+    def execute_all(self, coalesced: bool = True) -> None:
+        """Execute every pending command in one pass.
+
+        Commands run in the same order repeated `press_button` calls would run them (last set, first
+        run). With `coalesced`, contradictory pairs are dropped first; only commands that actually ran
+        are added to the history, so `press_undo` undoes them one by one. With a journal, every command
+        is checked before any runs; if a command raises, it and the commands after it stay queued.
+        """
+        commands = self.commands[::-1]
+        if self.journal is not None:
+            for command in commands:
+                self.journal.check(command)
+        self.commands.clear()
+        remaining = deque(coalesce(commands) if coalesced else commands)
+        try:
+            while remaining:
+                command = remaining[0]
+                command.execute()
+                remaining.popleft()
+                self._record(command)
+        finally:
+            self.commands.extend(reversed(remaining))
 
     def press_undo(self) -> None:
         """Undo the last command executed."""
         if self.history:
             command = self.history.pop()
             command.undo()
+            if self.journal is not None:
+                self.journal.append(command, undo=True)
+
+    def _record(self, command: Command) -> None:
+        """Add an executed command to the history and the journal."""
+        self.history.append(command)
+        if self.journal is not None:
+            self.journal.append(command)
+
+
+class CommandBus:
+    """
+    Executes commands on a worker thread pool, returning a future per command.
+
+    At most `max_pending` commands may be submitted but not yet finished; further submissions block, or
+    raise `queue.Full` when `block` is False or `timeout` expires. Commands sharing a `coalesce_key`
+    (for order commands, the same `Order`) run one at a time in submission order; commands without a
+    key run as soon as a worker is free. A key's commands are dispatched one per pool task, so a busy
+    order does not monopolise a worker.
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = 1_024) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="CommandBus")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._queues: dict[Hashable, deque[tuple[Command, "Future[None]"]]] = {}
+        self._closed = False
+
+    def __enter__(self) -> "CommandBus":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.shutdown()
+
+    def submit(self, command: Command, block: bool = True, timeout: Optional[float] = None) -> "Future[None]":
+        """Queue a command for execution and return a future resolved once it has run."""
+        if self._closed:
+            raise RuntimeError("cannot submit commands after shutdown")
+        acquired = self._slots.acquire(blocking=block, timeout=timeout if block else None)  # pylint: disable=R1732
+        if not acquired:
+            raise queue.Full("too many pending commands")
+        future: Future[None] = Future()
+        key = command.coalesce_key()
+        if key is None:
+            self._executor.submit(self._run, command, future)
+            return future
+        with self._lock:
+            pending = self._queues.get(key)
+            if pending is not None:
+                pending.append((command, future))
+                return future
+            self._queues[key] = deque([(command, future)])
+        self._executor.submit(self._drain, key)
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting commands; already submitted commands still run."""
+        self._closed = True
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, command: Command, future: "Future[None]") -> None:
+        """Execute a command and resolve its future."""
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    command.execute()
+                except BaseException as error:  # pylint: disable=broad-exception-caught
+                    future.set_exception(error)
+                else:
+                    future.set_result(None)
+        finally:
+            self._slots.release()
+
+    def _drain(self, key: Hashable) -> None:
+        """Run the oldest command for `key`, then reschedule the key if more are waiting.
+
+        After shutdown the pool accepts no new tasks, so the remaining commands run on this worker.
+        """
+        while True:
+            with self._lock:
+                command, future = self._queues[key][0]
+            self._run(command, future)
+            with self._lock:
+                pending = self._queues[key]
+                pending.popleft()
+                if not pending:
+                    del self._queues[key]
+                    return
+            try:
+                self._executor.submit(self._drain, key)
+                return
+            except RuntimeError:
+                continue
@@ -1,7 +1,17 @@
 """Module for Mediator Pattern in a Chat Application"""
 
+import asyncio
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import List
+from enum import Enum
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Union, cast
+
+_colleague_ids = itertools.count(1)
 
 
 class Mediator(ABC):
@@ -16,8 +26,9 @@ class Colleague(ABC):
     """Abstract Colleague class."""
 
     def __init__(self, mediator: Mediator) -> None:
-        """Initialize the colleague with a mediator."""
+        """Initialize the colleague with a mediator and a process-unique id."""
         self.mediator: Mediator = mediator
+        self.colleague_id: int = next(_colleague_ids)
 
     @abstractmethod
     def send(self, message: str) -> None:
@@ -27,23 +38,776 @@ class Colleague(ABC):
     def receive(self, message: str) -> None:
         """Receive a message from the mediator."""
 
+    async def receive_async(self, message: str) -> None:
+        """Receive a message delivered by an asynchronous mediator; defaults to `receive`."""
+        self.receive(message)
+
+    def receive_batch(self, messages: Sequence[str]) -> None:
+        """Receive several messages at once from a buffering mediator; defaults to `receive` for each."""
+        for message in messages:
+            self.receive(message)
+
+
+class MessageHistory:
+    """
+    Ring buffer of a room's most recent messages, bounded by count and by UTF-8 bytes.
+
+    Every appended message gets the next sequence number, starting at 0. The buffer keeps the newest
+    `max_messages` messages, evicting from the oldest end while their total size exceeds `max_bytes`;
+    slots are addressed by `seq % max_messages`, so appending and reading any sequence number are O(1).
+    It is safe to append and read from different threads.
+    """
+
+    def __init__(self, max_messages: int = 10_000, max_bytes: Optional[int] = None) -> None:
+        """Initialize an empty history with its bounds."""
+        if max_messages < 1:
+            raise ValueError("max_messages must be at least 1")
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self._entries: List[Optional[tuple[int, str, int]]] = [None] * max_messages
+        self._first_seq = 0
+        self._next_seq = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of retained messages."""
+        return self._next_seq - self._first_seq
+
+    @property
+    def first_seq(self) -> int:
+        """Return the sequence number of the oldest retained message."""
+        return self._first_seq
+
+    @property
+    def next_seq(self) -> int:
+        """Return the sequence number the next message will get."""
+        return self._next_seq
+
+    def nbytes(self) -> int:
+        """Return the UTF-8 size of the retained messages."""
+        return self._bytes
+
+    def append(self, message: str, sender_id: int) -> int:
+        """Record a message and return its sequence number."""
+        size = len(message.encode())
+        with self._lock:
+            seq = self._next_seq
+            if seq - self._first_seq == self.max_messages:
+                self._evict_oldest()
+            self._entries[seq % self.max_messages] = (sender_id, message, size)
+            self._next_seq = seq + 1
+            self._bytes += size
+            if self.max_bytes is not None:
+                while self._bytes > self.max_bytes:
+                    self._evict_oldest()
+            return seq
+
+    def read(self, since: int, limit: int, until: Optional[int] = None) -> tuple[int, List[tuple[int, str]]]:
+        """Return the first retained seq >= `since` and up to `limit` (sender_id, message) entries before `until`."""
+        with self._lock:
+            start = max(since, self._first_seq)
+            stop = min(start + limit, self._next_seq if until is None else min(until, self._next_seq))
+            entries = []
+            for seq in range(start, stop):
+                sender_id, message, _ = cast(tuple[int, str, int], self._entries[seq % self.max_messages])
+                entries.append((sender_id, message))
+            return start, entries
+
+    def _evict_oldest(self) -> None:
+        """Drop the oldest retained message."""
+        slot = self._first_seq % self.max_messages
+        entry = self._entries[slot]
+        if entry is not None:
+            self._bytes -= entry[2]
+        self._entries[slot] = None
+        self._first_seq += 1
+
 
 class ChatRoom(Mediator):
-    """Concrete Mediator class for managing chat interactions."""
+    """
+    Concrete Mediator class for managing chat interactions.
+
+    Members are indexed by `colleague_id`: a dict maps each id to its slot in a dense list of bound
+    `receive` methods, so joining and leaving are O(1) (leaving moves the last member into the freed
+    slot) and adding a member twice has no effect. `send` delivers to the slots before and after the
+    sender's, so the broadcast loop does no per-member comparison. Delivery order follows the slots.
+
+    With a `history`, sent messages are also recorded there, and a colleague joining late can be
+    replayed the retained messages from a sequence number via `add_colleague(..., replay_from=seq)` or
+    `replay`. Replay copies one batch at a time out of the history and delivers it with
+    `receive_batch` without holding the history's lock, so live sends are never held up for the whole
+    replay. Messages sent to the room while a joining colleague is being replayed, from any thread, are
+    buffered and delivered after the replay, so the colleague sees them in order; broadcasts hold a
+    reentrant lock so none slips in while the colleague is switched over to live delivery. If the
+    replay raises, the colleague is removed again.
+    """
+
+    def __init__(self, history: Optional[MessageHistory] = None) -> None:
+        """Initialize an empty chat room, optionally recording messages in `history`."""
+        self._members: List[Colleague] = []
+        self._receivers: List[Callable[[str], None]] = []
+        self._slots: Dict[int, int] = {}
+        self._lock = threading.RLock()
+        self.history = history
+
+    def __getstate__(self) -> Dict[str, object]:
+        """Return the state to pickle, without the broadcast lock."""
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, object]) -> None:
+        """Restore a pickled room with a fresh broadcast lock."""
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    @property
+    def colleagues(self) -> tuple[Colleague, ...]:
+        """Return the current members as a read-only snapshot; use add_colleague/remove_colleague to change them."""
+        return tuple(self._members)
+
+    def __len__(self) -> int:
+        """Return the number of members."""
+        return len(self._members)
+
+    def __contains__(self, colleague: object) -> bool:
+        """Return True if the colleague is a member."""
+        return isinstance(colleague, Colleague) and colleague.colleague_id in self._slots
+
+    def add_colleague(self, colleague: Colleague, replay_from: Optional[int] = None) -> None:
+        """Add a colleague to the chat room (no-op for members), replaying history since `replay_from` if given."""
+        if colleague.colleague_id in self._slots:
+            return
+        if replay_from is None:
+            self._join(colleague, self._receiver_for(colleague))
+            return
+        if self.history is None:
+            raise RuntimeError("chat room keeps no history")
+        joined_at = self.history.next_seq
+        live: List[str] = []
+        self._join(colleague, live.append)
+        try:
+            self.replay(colleague, replay_from, until=joined_at)
+            self._hand_over(colleague, live)
+        except BaseException:
+            self.remove_colleague(colleague)
+            raise
+
+    def _join(self, colleague: Colleague, receive: Callable[[str], None]) -> None:
+        """Give a new member the next slot, delivering to it through `receive`."""
+        self._slots[colleague.colleague_id] = len(self._members)
+        self._members.append(colleague)
+        self._receivers.append(receive)
+
+    def _hand_over(self, colleague: Colleague, live: List[str]) -> None:
+        """Deliver the messages buffered in `live` during a replay, then switch the member to live delivery."""
+        if colleague.colleague_id not in self._slots:
+            return
+        receive = self._receiver_for(colleague)
+        while live:
+            sent_during_replay = live[:]
+            del live[: len(sent_during_replay)]
+            for message in sent_during_replay:
+                receive(message)
+        # Broadcasts take the lock too, so nothing lands in `live` between the last drain and the swap
+        with self._lock:
+            for message in live:
+                receive(message)
+            live.clear()
+            slot = self._slots.get(colleague.colleague_id)
+            if slot is not None:
+                self._receivers[slot] = receive
+
+    def replay(self, colleague: Colleague, since: int, until: Optional[int] = None, batch_size: int = 256) -> int:
+        """Deliver retained messages in [`since`, `until`) from others in batches; return the next seq to ask for."""
+        if self.history is None:
+            raise RuntimeError("chat room keeps no history")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        seq = since
+        while True:
+            start, entries = self.history.read(seq, batch_size, until)
+            if not entries:
+                return start
+            messages = [message for sender_id, message in entries if sender_id != colleague.colleague_id]
+            if messages:
+                colleague.receive_batch(messages)
+            seq = start + len(entries)
+
+    def remove_colleague(self, colleague: Union[Colleague, int]) -> Optional[Colleague]:
+        """Remove a colleague, given the colleague or its id, and return it; returns None for a non-member."""
+        colleague_id = colleague if isinstance(colleague, int) else colleague.colleague_id
+        slot = self._slots.pop(colleague_id, None)
+        if slot is None:
+            return None
+        removed = self._members[slot]
+        last_member = self._members.pop()
+        last_receiver = self._receivers.pop()
+        if slot < len(self._members):
+            self._members[slot] = last_member
+            self._receivers[slot] = last_receiver
+            self._slots[last_member.colleague_id] = slot
+        return removed
+
+    def _receiver_for(self, colleague: Colleague) -> Callable[[str], None]:
+        """Return the callable that `send` hands each message for this colleague."""
+        return colleague.receive
+
+    def send(self, message: str, colleague: Colleague) -> None:
+        """Send a message from one colleague to all others."""
+        if self.history is not None:
+            self.history.append(message, colleague.colleague_id)
+        self._broadcast(message, colleague.colleague_id)
+
+    def _broadcast(self, message: str, sender_id: int) -> None:
+        """Deliver a message to every member except the one with `sender_id`."""
+        with self._lock:
+            receivers = self._receivers
+            slot = self._slots.get(sender_id)
+            if slot is None:
+                for receive in receivers:
+                    receive(message)
+                return
+            # Do not send the message back to the sender
+            for receive in receivers[:slot]:
+                receive(message)
+            for receive in receivers[slot + 1 :]:
+                receive(message)
+
+
+class OverflowPolicy(str, Enum):
+    """What an AsyncChatRoom does when a colleague's queue is full."""
+
+    DROP_OLDEST = "drop-oldest"
+    DROP_NEW = "drop-new"
+    DISCONNECT = "disconnect"
+
+
+class DeliveryStats(NamedTuple):
+    """Per-colleague delivery metrics of an AsyncChatRoom; latencies are in seconds, enqueue to receipt."""
+
+    queue_depth: int
+    delivered: int
+    dropped: int
+    failed: int
+    mean_latency: float
+    max_latency: float
+
+
+class _Mailbox:  # pylint: disable=too-many-instance-attributes
+    """A colleague's bounded queue, its delivery task and its counters."""
+
+    def __init__(self, room: "AsyncChatRoom", colleague: Colleague) -> None:
+        self.room = room
+        self.colleague = colleague
+        self.queue: asyncio.Queue[tuple[float, str]] = asyncio.Queue(room.maxsize)
+        self.delivered = 0
+        self.dropped = 0
+        self.failed = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.task = asyncio.get_running_loop().create_task(self._deliver())
+
+    def put(self, message: str) -> None:
+        """Enqueue a message, applying the room's overflow policy if the queue is full."""
+        try:
+            self.queue.put_nowait((time.monotonic(), message))
+            return
+        except asyncio.QueueFull:
+            pass
+        self.dropped += 1
+        if self.room.policy is OverflowPolicy.DROP_OLDEST:
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self.queue.put_nowait((time.monotonic(), message))
+        elif self.room.policy is OverflowPolicy.DISCONNECT:
+            self.room.disconnect(self.colleague)
+
+    def close(self) -> None:
+        """Cancel the delivery task and discard queued messages, releasing anyone waiting in `join`."""
+        self.task.cancel()
+        while not self.queue.empty():
+            self.queue.get_nowait()
+            self.queue.task_done()
+
+    def stats(self) -> DeliveryStats:
+        """Return the current metrics."""
+        mean = self.total_latency / self.delivered if self.delivered else 0.0
+        return DeliveryStats(self.queue.qsize(), self.delivered, self.dropped, self.failed, mean, self.max_latency)
+
+    async def _deliver(self) -> None:
+        """Hand queued messages to the colleague one at a time, recording latency."""
+        while True:
+            enqueued_at, message = await self.queue.get()
+            try:
+                await self.colleague.receive_async(message)
+            except Exception:  # pylint: disable=broad-exception-caught
+                # A failing receiver must not stop its own delivery task.
+                self.failed += 1
+            else:
+                latency = time.monotonic() - enqueued_at
+                self.delivered += 1
+                self.total_latency += latency
+                self.max_latency = max(self.max_latency, latency)
+            finally:
+                self.queue.task_done()
+
+
+class AsyncChatRoom(ChatRoom):
+    """
+    Chat room whose deliveries run on asyncio, so a slow receiver only delays itself.
+
+    Each member gets a queue of at most `maxsize` messages and a task that awaits
+    `Colleague.receive_async` for one message at a time. `send` only enqueues and returns. When a
+    member's queue is full, `policy` either drops its oldest queued message, drops the new one, or
+    disconnects the member (its id is appended to `disconnected`). Members must be added while the
+    event loop is running; `join` waits for queued messages and `aclose` stops the delivery tasks.
+    """
+
+    def __init__(self, maxsize: int = 1_000, policy: Union[OverflowPolicy, str] = OverflowPolicy.DROP_OLDEST) -> None:
+        """Initialize an empty room with the per-colleague queue bound and overflow policy."""
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        super().__init__()
+        self.maxsize = maxsize
+        self.policy = OverflowPolicy(policy)
+        self.disconnected: List[int] = []
+        self._mailboxes: Dict[int, _Mailbox] = {}
+
+    async def __aenter__(self) -> "AsyncChatRoom":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    def remove_colleague(self, colleague: Union[Colleague, int]) -> Optional[Colleague]:
+        """Remove a colleague and cancel its delivery task, discarding anything still queued."""
+        removed = super().remove_colleague(colleague)
+        if removed is not None:
+            self._mailboxes.pop(removed.colleague_id).close()
+        return removed
+
+    def disconnect(self, colleague: Colleague) -> None:
+        """Remove a colleague that cannot keep up and record its id."""
+        if self.remove_colleague(colleague) is not None:
+            self.disconnected.append(colleague.colleague_id)
+
+    def stats(self, colleague: Union[Colleague, int]) -> DeliveryStats:
+        """Return the delivery metrics of a member."""
+        colleague_id = colleague if isinstance(colleague, int) else colleague.colleague_id
+        return self._mailboxes[colleague_id].stats()
+
+    def metrics(self) -> Dict[int, DeliveryStats]:
+        """Return the delivery metrics of every member, keyed by colleague id."""
+        return {colleague_id: mailbox.stats() for colleague_id, mailbox in self._mailboxes.items()}
+
+    async def join(self) -> None:
+        """Wait until every message queued so far has been delivered or dropped."""
+        await asyncio.gather(*(mailbox.queue.join() for mailbox in list(self._mailboxes.values())))
+
+    async def aclose(self) -> None:
+        """Cancel every delivery task and wait for them to finish."""
+        tasks = [mailbox.task for mailbox in self._mailboxes.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _receiver_for(self, colleague: Colleague) -> Callable[[str], None]:
+        """Create the colleague's mailbox; `send` enqueues into it."""
+        mailbox = self._mailboxes[colleague.colleague_id] = _Mailbox(self, colleague)
+        return mailbox.put
+
+
+class BufferedChatRoom(ChatRoom):  # pylint: disable=too-many-instance-attributes
+    """
+    Chat room that buffers messages and delivers them to each member in batches.
+
+    Messages are collected until `window` seconds have passed since the first one or `max_batch` are
+    pending, then each member gets a single `receive_batch` call with the messages others sent, in
+    order; colleagues that do not override it fall back to one `receive` per message. A window of 0
+    delivers every message as it is sent. Window flushes run on a background thread and full batches
+    are flushed by the sending thread; batches are always delivered one at a time and in order.
+    `flush` delivers what is pending now and `close` flushes and stops the thread. A member whose
+    `receive_batch` raises misses that batch and is counted in `failed`; delivery to the others and
+    the flush thread carry on.
+    """
+
+    def __init__(self, window: float = 0.001, max_batch: int = 1_024) -> None:
+        """Initialize an empty room with its flush window (seconds) and batch size."""
+        if window < 0:
+            raise ValueError("window must not be negative")
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        super().__init__()
+        self.window = window
+        self.max_batch = max_batch
+        self._condition = threading.Condition()
+        self._delivery = threading.Lock()
+        self._pending: List[tuple[int, str]] = []
+        self._first_at = 0.0
+        self._closed = False
+        self.failed = 0
+        self._flusher: Optional[threading.Thread] = None
+        if window > 0:
+            self._flusher = threading.Thread(target=self._flush_loop, name="BufferedChatRoom", daemon=True)
+            self._flusher.start()
+
+    def __enter__(self) -> "BufferedChatRoom":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def send(self, message: str, colleague: Colleague) -> None:
+        """Buffer a message from one colleague to all others, flushing if the batch is full."""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("chat room is closed")
+            if not self._pending:
+                self._first_at = time.monotonic()
+                self._condition.notify()
+            self._pending.append((colleague.colleague_id, message))
+            full = self.window == 0 or len(self._pending) >= self.max_batch
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        """Deliver every pending message now."""
+        with self._delivery:
+            with self._condition:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+            messages = tuple(message for _, message in batch)
+            senders = {sender_id for sender_id, _ in batch}
+            for member in list(self._members):
+                if member.colleague_id not in senders:
+                    self._deliver(member, messages)
+                    continue
+                # Do not send the member's own messages back
+                others = tuple(message for sender_id, message in batch if sender_id != member.colleague_id)
+                if others:
+                    self._deliver(member, others)
+
+    def close(self) -> None:
+        """Stop the flush thread and deliver anything still pending."""
+        with self._condition:
+            was_closed, self._closed = self._closed, True
+            self._condition.notify()
+        if was_closed:
+            return
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+
+    def _deliver(self, member: Colleague, messages: Sequence[str]) -> None:
+        """Hand a batch to one member, counting rather than raising its failure."""
+        try:
+            member.receive_batch(messages)
+        except Exception:  # pylint: disable=broad-exception-caught
+            # A failing receiver must not stop delivery to the others or kill the flush thread.
+            self.failed += 1
+
+    def _flush_loop(self) -> None:
+        """Flush each batch once its window has passed, until closed."""
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                remaining = self._first_at + self.window - time.monotonic()
+                while self._pending and not self._closed and remaining > 0:
+                    self._condition.wait(remaining)
+                    remaining = self._first_at + self.window - time.monotonic()
+            self.flush()
+
+
+class _ShardLink(Mediator):
+    """The mediator colleagues see inside a shard process: a send is queued to every shard."""
+
+    def __init__(self, queues: "List[multiprocessing.Queue[Optional[tuple[int, str]]]]") -> None:
+        self._queues = queues
+
+    def send(self, message: str, colleague: Colleague) -> None:
+        """Queue a message from a colleague for every shard."""
+        item = (colleague.colleague_id, message)
+        for shard_queue in self._queues:
+            shard_queue.put(item)
+
+
+class _ShardRoom(ChatRoom):
+    """The room inside a shard process: delivers to each colleague, counting rather than raising failures."""
 
     def __init__(self) -> None:
-        """Initialize the chat room with a list of colleagues."""
-        self.colleagues: List[Colleague] = []
+        super().__init__()
+        self.failed = 0
+
+    def _receiver_for(self, colleague: Colleague) -> Callable[[str], None]:
+        """Return a receiver that counts the colleague's exceptions instead of letting them end the shard."""
+
+        def receive(message: str) -> None:
+            try:
+                colleague.receive(message)
+            except Exception:  # pylint: disable=broad-exception-caught
+                # A failing receiver must not kill the shard, which would never hand its colleagues back.
+                self.failed += 1
+
+        return receive
+
+
+def _run_shard(
+    shard: int,
+    colleagues: List[Colleague],
+    queues: "List[multiprocessing.Queue[Optional[tuple[int, str]]]]",
+    results: "multiprocessing.Queue[tuple[int, List[Colleague], int]]",
+) -> None:
+    """Deliver a shard's queued messages to its colleagues until a None sentinel, then return them."""
+    link = _ShardLink(queues)
+    room = _ShardRoom()
+    for colleague in colleagues:
+        colleague.mediator = link
+        room.add_colleague(colleague)
+    inbox = queues[shard]
+    while (item := inbox.get()) is not None:
+        room._broadcast(item[1], item[0])  # pylint: disable=protected-access
+    # Queues only travel to processes by inheritance, so detach the link before sending colleagues back.
+    for colleague in colleagues:
+        colleague.mediator = ChatRoom()
+    results.put((shard, colleagues, room.failed))
+
+
+class ShardedChatRoom(Mediator):  # pylint: disable=too-many-instance-attributes
+    """
+    Chat room whose colleagues run in `workers` processes, so CPU-bound `receive` calls use every core.
+
+    Colleagues are added before `start` and dealt round-robin to shards. `start` forks one process per
+    shard with its colleagues; `send` puts the message on every shard's `multiprocessing.Queue`, and each
+    shard delivers it to its colleagues except the sender. Queues are FIFO, so messages from one sender
+    arrive in the order they were sent. Inside a shard `colleague.mediator` forwards sends to every
+    shard. `close` stops the shards and replaces `colleagues` with their final, shard-side copies;
+    colleagues must therefore be picklable, and messages a shard sends while closing may be dropped.
+
+    A `receive` that raises is counted in `failed` (known once the room is closed) and delivery carries
+    on. If a shard process dies anyway, `close` still collects the other shards and then raises
+    RuntimeError instead of waiting forever for the dead one.
+    """
+
+    _POLL_INTERVAL = 1.0
+
+    def __init__(self, workers: Optional[int] = None) -> None:
+        """Initialize an empty room with `workers` shards (default: one per CPU)."""
+        workers = workers if workers is not None else os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.workers = workers
+        self._context = multiprocessing.get_context()
+        self._queues: "List[multiprocessing.Queue[Optional[tuple[int, str]]]]" = [
+            self._context.Queue() for _ in range(workers)
+        ]
+        self._results: "multiprocessing.Queue[tuple[int, List[Colleague], int]]" = self._context.Queue()
+        self._shards: List[List[Colleague]] = [[] for _ in range(workers)]
+        self._members: Dict[int, Colleague] = {}
+        self._processes: List[multiprocessing.process.BaseProcess] = []
+        self._started = False
+        self._closed = False
+        self.failed = 0
+
+    def __enter__(self) -> "ShardedChatRoom":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @property
+    def colleagues(self) -> tuple[Colleague, ...]:
+        """Return the members in the order they were added, as a read-only snapshot."""
+        return tuple(self._members.values())
 
     def add_colleague(self, colleague: Colleague) -> None:
-        """Add a colleague to the chat room."""
-        self.colleagues.append(colleague)
+        """Add a colleague to the next shard; adding a member again is a no-op."""
+        if self._started:
+            raise RuntimeError("colleagues must be added before the room starts")
+        if colleague.colleague_id in self._members:
+            return
+        self._shards[len(self._members) % self.workers].append(colleague)
+        self._members[colleague.colleague_id] = colleague
+
+    def start(self) -> None:
+        """Start one process per shard."""
+        if self._started:
+            return
+        self._started = True
+        for shard, colleagues in enumerate(self._shards):
+            process = self._context.Process(
+                target=_run_shard, args=(shard, colleagues, self._queues, self._results), name=f"ChatShard-{shard}"
+            )
+            # Start methods that pickle the arguments must not pickle this room along with them.
+            for colleague in colleagues:
+                colleague.mediator = ChatRoom()
+            process.start()
+            for colleague in colleagues:
+                colleague.mediator = self
+            self._processes.append(process)
 
     def send(self, message: str, colleague: Colleague) -> None:
-        """Send a message from one colleague to all others."""
-        for c in self.colleagues:
-            if c != colleague:  # Do not send the message back to the sender
-                c.receive(message)
+        """Queue a message from one colleague for delivery to all others."""
+        if not self._started or self._closed:
+            raise RuntimeError("chat room is not running")
+        item = (colleague.colleague_id, message)
+        for shard_queue in self._queues:
+            shard_queue.put(item)
+
+    def close(self) -> None:
+        """Let every shard finish its queued messages, collect the colleagues back and stop the processes."""
+        if not self._started or self._closed:
+            return
+        self._closed = True
+        for shard_queue in self._queues:
+            shard_queue.put(None)
+        pending = set(range(len(self._processes)))
+        dead = []
+        while pending:
+            # A shard that had already exited before a whole poll interval without its result is dead.
+            exited = {shard for shard in pending if not self._processes[shard].is_alive()}
+            try:
+                shard, colleagues, failed = self._results.get(timeout=self._POLL_INTERVAL)
+            except queue.Empty:
+                dead.extend(sorted(exited))
+                pending -= exited
+                continue
+            pending.discard(shard)
+            self._shards[shard] = colleagues
+            self.failed += failed
+        for process in self._processes:
+            process.join()
+        for shard, colleagues in enumerate(self._shards):
+            for colleague in colleagues:
+                colleague.mediator = self
+                if shard not in dead:
+                    self._members[colleague.colleague_id] = colleague
+        if dead:
+            codes = ", ".join(f"shard {shard}: {self._processes[shard].exitcode}" for shard in dead)
+            raise RuntimeError(f"shard processes died without returning their colleagues ({codes})")
+
+
+class _TopicNode:
+    """A trie node for one topic segment: child segments and the receivers subscribed at this node."""
+
+    __slots__ = ("children", "subscribers")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_TopicNode"] = {}
+        self.subscribers: Dict[int, Callable[[str], None]] = {}
+
+
+class TopicMediator(Mediator):
+    """
+    Mediator that routes messages by dot-separated topic, such as `orders.book.eu`.
+
+    Colleagues subscribe to topics or to patterns where `*` matches exactly one segment
+    (`orders.*.eu`). Subscriptions live in a trie keyed by segment, so publishing walks one path per
+    matching wildcard and only visits the colleagues whose patterns match, whatever the number of
+    subscriptions. A colleague matched by several of its patterns receives a message once, and the
+    sender never receives its own message.
+
+    As a plain `Mediator`, `send(message, colleague)` publishes on the colleague's publish topic, set
+    with `set_publish_topic`, or on `default_topic` if it has none.
+    """
+
+    WILDCARD = "*"
+
+    def __init__(self, default_topic: str = "broadcast") -> None:
+        """Initialize a mediator with no subscriptions and the topic colleagues publish on by default."""
+        self._segments(default_topic)
+        self.default_topic = default_topic
+        self._root = _TopicNode()
+        self._subscriptions = 0
+        self._publish_topics: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        """Return the number of (colleague, pattern) subscriptions."""
+        return self._subscriptions
+
+    def subscribe(self, colleague: Colleague, pattern: str) -> None:
+        """Subscribe a colleague to a topic or wildcard pattern; subscribing twice is a no-op."""
+        node = self._root
+        for segment in self._segments(pattern):
+            node = node.children.setdefault(segment, _TopicNode())
+        if colleague.colleague_id not in node.subscribers:
+            node.subscribers[colleague.colleague_id] = colleague.receive
+            self._subscriptions += 1
+
+    def unsubscribe(self, colleague: Colleague, pattern: str) -> None:
+        """Remove one subscription, pruning trie nodes left empty; unknown subscriptions are ignored."""
+        path = [self._root]
+        segments = self._segments(pattern)
+        for segment in segments:
+            child = path[-1].children.get(segment)
+            if child is None:
+                return
+            path.append(child)
+        if path[-1].subscribers.pop(colleague.colleague_id, None) is None:
+            return
+        self._subscriptions -= 1
+        for segment, parent, node in zip(reversed(segments), reversed(path[:-1]), reversed(path)):
+            if node.subscribers or node.children:
+                break
+            del parent.children[segment]
+
+    def publish(self, topic: str, message: str, sender: Optional[Colleague] = None) -> int:
+        """Deliver a message to every subscriber whose pattern matches `topic`; return the deliveries."""
+        nodes = [self._root]
+        for segment in self._segments(topic):
+            matched = []
+            for node in nodes:
+                exact = node.children.get(segment)
+                if exact is not None:
+                    matched.append(exact)
+                wildcard = node.children.get(self.WILDCARD)
+                if wildcard is not None:
+                    matched.append(wildcard)
+            if not matched:
+                return 0
+            nodes = matched
+        if len(nodes) == 1:
+            receivers = nodes[0].subscribers
+        else:
+            receivers = {}
+            for node in nodes:
+                receivers.update(node.subscribers)
+        sender_id = sender.colleague_id if sender is not None else None
+        if sender_id in receivers:
+            receivers = {key: receive for key, receive in receivers.items() if key != sender_id}
+        for receive in list(receivers.values()):
+            receive(message)
+        return len(receivers)
+
+    def set_publish_topic(self, colleague: Colleague, topic: Optional[str]) -> None:
+        """Set the topic a colleague's sends are published on; None restores the default topic."""
+        if topic is None:
+            self._publish_topics.pop(colleague.colleague_id, None)
+            return
+        self._segments(topic)
+        self._publish_topics[colleague.colleague_id] = topic
+
+    def send(self, message: str, colleague: Colleague, topic: Optional[str] = None) -> None:
+        """Publish a message from a colleague on `topic`, or on its publish topic if none is given."""
+        if topic is None:
+            topic = self._publish_topics.get(colleague.colleague_id, self.default_topic)
+        self.publish(topic, message, colleague)
+
+    @staticmethod
+    def _segments(pattern: str) -> List[str]:
+        """Split a topic or pattern into segments, rejecting empty ones."""
+        segments = pattern.split(".")
+        if not all(segments):
+            raise ValueError(f"invalid topic: {pattern!r}")
+        return segments
 
 
 class User(Colleague):
@@ -1,5 +1,8 @@
 """Module implementing the Memento Pattern for a Text Editor."""
 
+import random
+from typing import Optional
+
 
 class Memento:
     """Memento class that stores the state of the text editor."""
@@ -13,12 +16,165 @@ class Memento:
         return self._state
 
 
+class _Piece:
+    """Treap node for a span `source[start:end]`; `size` is the length of the whole subtree's text."""
+
+    __slots__ = ("source", "start", "end", "priority", "left", "right", "size")
+
+    def __init__(self, source: str, start: int, end: int, priority: float) -> None:
+        self.source = source
+        self.start = start
+        self.end = end
+        self.priority = priority
+        self.left: Optional[_Piece] = None
+        self.right: Optional[_Piece] = None
+        self.size = end - start
+
+
+def _size(piece: Optional[_Piece]) -> int:
+    """Return the text length of a subtree."""
+    return piece.size if piece is not None else 0
+
+
+def _resize(piece: _Piece) -> _Piece:
+    """Recompute a node's subtree length from its span and children."""
+    piece.size = piece.end - piece.start + _size(piece.left) + _size(piece.right)
+    return piece
+
+
+def _split(piece: Optional[_Piece], position: int) -> tuple[Optional[_Piece], Optional[_Piece]]:
+    """Split a subtree into its first `position` characters and the rest, cutting a span if needed."""
+    if piece is None:
+        return None, None
+    left_size = _size(piece.left)
+    if position <= left_size:
+        left, piece.left = _split(piece.left, position)
+        return left, _resize(piece)
+    span_end = left_size + piece.end - piece.start
+    if position >= span_end:
+        piece.right, right = _split(piece.right, position - span_end)
+        return _resize(piece), right
+    # The cut falls inside this span: both halves keep referring to the same source string.
+    cut = piece.start + position - left_size
+    tail = _Piece(piece.source, cut, piece.end, piece.priority)
+    tail.right, piece.right = piece.right, None
+    piece.end = cut
+    return _resize(piece), _resize(tail)
+
+
+def _merge(left: Optional[_Piece], right: Optional[_Piece]) -> Optional[_Piece]:
+    """Concatenate two subtrees, keeping the treap's heap order on priorities."""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        return _resize(left)
+    right.left = _merge(left, right.left)
+    return _resize(right)
+
+
+class PieceTable:
+    """
+    Text buffer of spans over immutable strings, kept in a treap ordered by position.
+
+    Inserting or deleting at any position splits and re-merges the treap in expected O(log n) steps and
+    never copies the document: the initial text and each inserted string are referenced, not sliced.
+    Consecutive inserts at the end of the previous one (ordinary typing) and deletes at its end
+    (backspace) are coalesced in a pending run that enters the treap as a single span. `get_text`
+    joins the spans only when called and caches the result until the next edit.
+    """
+
+    def __init__(self, text: str = "") -> None:
+        """Initialize the buffer with `text`."""
+        self._root: Optional[_Piece] = _Piece(text, 0, len(text), random.random()) if text else None
+        self._pending: list[str] = []
+        self._pending_at = 0
+        self._pending_size = 0
+        self._text: Optional[str] = text
+
+    def __len__(self) -> int:
+        """Return the length of the text."""
+        return _size(self._root) + self._pending_size
+
+    def insert(self, position: int, text: str) -> None:
+        """Insert `text` before the character at `position` (0 to len inclusive)."""
+        if not 0 <= position <= len(self):
+            raise IndexError(f"position {position} out of range")
+        if not text:
+            return
+        self._text = None
+        if not self._pending or position != self._pending_at + self._pending_size:
+            self._commit()
+            self._pending_at = position
+        self._pending.append(text)
+        self._pending_size += len(text)
+
+    def delete(self, position: int, length: int) -> None:
+        """Delete `length` characters starting at `position`."""
+        if length < 0 or position < 0 or position + length > len(self):
+            raise IndexError(f"range {position}:{position + length} out of range")
+        if not length:
+            return
+        self._text = None
+        pending_end = self._pending_at + self._pending_size
+        if self._pending and position + length == pending_end and position >= self._pending_at:
+            self._trim_pending(length)
+            return
+        self._commit()
+        left, rest = _split(self._root, position)
+        _, right = _split(rest, length)
+        self._root = _merge(left, right)
+
+    def get_text(self) -> str:
+        """Return the whole text, joining the spans on first use after an edit."""
+        if self._text is None:
+            self._commit()
+            spans: list[str] = []
+            stack: list[_Piece] = []
+            piece = self._root
+            while stack or piece is not None:
+                while piece is not None:
+                    stack.append(piece)
+                    piece = piece.left
+                piece = stack.pop()
+                spans.append(piece.source[piece.start : piece.end])
+                piece = piece.right
+            self._text = "".join(spans)
+        return self._text
+
+    def _commit(self) -> None:
+        """Move the pending run into the treap as one span."""
+        if not self._pending:
+            return
+        text = "".join(self._pending)
+        self._pending.clear()
+        self._pending_size = 0
+        left, right = _split(self._root, self._pending_at)
+        self._root = _merge(_merge(left, _Piece(text, 0, len(text), random.random())), right)
+
+    def _trim_pending(self, length: int) -> None:
+        """Drop the last `length` characters of the pending run."""
+        self._pending_size -= length
+        while length:
+            last = self._pending.pop()
+            if len(last) > length:
+                self._pending.append(last[: len(last) - length])
+                break
+            length -= len(last)
+
+
 class TextEditor:
-    """TextEditor class that can create and restore mementos."""
+    """TextEditor class that can create and restore mementos.
 
-    def __init__(self) -> None:
-        """Initialize the TextEditor with empty text and an empty list of mementos."""
-        self._text = ""
+    The text lives in a `PieceTable`, so typing and editing anywhere in a large document does not copy it;
+    `get_text` and `save` materialize it when asked.
+    """
+
+    def __init__(self, text: str = "") -> None:
+        """Initialize the TextEditor with `text` (empty by default) and an empty list of mementos."""
+        self._buffer = PieceTable(text)
         self._mementos: list[Memento] = []
 
     def type(self, text: str) -> None:
@@ -27,11 +183,29 @@ class TextEditor:
         Args:
             text (str): The text to be added to the current state.
         """
-        self._text += text
+        self._buffer.insert(len(self._buffer), text)
+
+    def insert(self, position: int, text: str) -> None:
+        """Insert text at a position in the editor.
+
+        Args:
+            position (int): Offset from 0 to the text length.
+            text (str): The text to insert.
+        """
+        self._buffer.insert(position, text)
+
+    def delete(self, position: int, length: int) -> None:
+        """Delete text from the editor.
+
+        Args:
+            position (int): Offset of the first character to delete.
+            length (int): Number of characters to delete.
+        """
+        self._buffer.delete(position, length)
 
     def save(self) -> None:
         """Save the current state as a memento."""
-        self._mementos.append(Memento(self._text))
+        self._mementos.append(Memento(self._buffer.get_text()))
 
     def undo(self) -> str | None:
         """Restore the last saved state, if available.
@@ -45,11 +219,9 @@ class TextEditor:
 
         self._mementos.pop()
 
-        if self._mementos:
-            self._text = self._mementos[-1].get_state()
-        else:
-            self._text = ""
-        return self._text
+        text = self._mementos[-1].get_state() if self._mementos else ""
+        self._buffer = PieceTable(text)
+        return text
 
     def get_text(self) -> str:
         """Get the current text in the editor.
@@ -57,4 +229,4 @@ class TextEditor:
         Returns:
             str: The current text in the editor.
         """
-        return self._text
+        return self._buffer.get_text()
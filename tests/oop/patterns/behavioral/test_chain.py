@@ -8,11 +8,82 @@ in the chain processes requests or passes them to the next handler appropriately
 Classes:
     TestChainOfResponsibility (unittest.TestCase):
         Unit tests for testing different handlers in the Chain of Responsibility.
+    TestCompiledChain (unittest.TestCase):
+        Unit tests for routing requests through a CompiledChain.
+    TestChainExecution (unittest.TestCase):
+        Unit tests for iterative execution of long chains and batch routing with handle_many.
+    TestAdaptiveChain (unittest.TestCase):
+        Unit tests for reordering handlers by hit rate in an AdaptiveChain.
+    TestAsyncChain (unittest.IsolatedAsyncioTestCase):
+        Unit tests for asyncio chains mixing async and sync handlers.
+    TestCachedChain (unittest.TestCase):
+        Unit tests for the LRU result cache and its invalidation on relinking.
+    TestMatchHandlers (unittest.TestCase):
+        Unit tests for declarative matcher handlers and their compiled lookup.
 """
 
+import asyncio
 import unittest
+from typing import Optional
+from unittest.mock import MagicMock, patch
 
-from src.oop.patterns.behavioral.chain import HighLevelHandler, LowLevelHandler, MidLevelHandler
+from src.oop.patterns.behavioral.chain import (
+    AbstractHandler,
+    AdaptiveChain,
+    AsyncAbstractHandler,
+    CacheStats,
+    CompiledChain,
+    ExactHandler,
+    GlobHandler,
+    HighLevelHandler,
+    LowLevelHandler,
+    MidLevelHandler,
+    PrefixHandler,
+    RegexHandler,
+)
+
+
+class StartsWithHandler(AbstractHandler):
+    """Predicate handler without an `accepts` declaration, used to test ordered fallback."""
+
+    def __init__(self, prefix: str) -> None:
+        self.prefix = prefix
+
+    def process(self, request: str) -> Optional[str]:
+        """Handle requests starting with the prefix."""
+        if request.startswith(self.prefix):
+            return f"StartsWithHandler({self.prefix}): Handling {request}"
+        return None
+
+
+class LegacyHandler(AbstractHandler):
+    """Handler overriding `handle` directly, as handlers did before `process` existed."""
+
+    def handle(self, request: str) -> Optional[str]:
+        """Handle 'legacy' requests, or pass it to the next handler."""
+        if request == "legacy":
+            return f"LegacyHandler: Handling {request}"
+        return super().handle(request)
+
+
+class AsyncKeyHandler(AsyncAbstractHandler):
+    """Async exact-match handler that records how many of its calls overlap."""
+
+    def __init__(self, key: str, latency: float = 0.0) -> None:
+        self.key = key
+        self.latency = latency
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def process(self, request: str) -> Optional[str]:
+        """Handle the request if it equals the key, after simulated latency."""
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        await asyncio.sleep(self.latency)
+        self.in_flight -= 1
+        if request == self.key:
+            return f"AsyncKeyHandler({self.key}): Handling {request}"
+        return None
 
 
 class TestChainOfResponsibility(unittest.TestCase):
@@ -82,3 +153,334 @@ class TestChainOfResponsibility(unittest.TestCase):
         If none of the handlers can process the request, the response should be None.
         """
         self.assertIsNone(self.low.handle("unknown"))
+
+
+class TestCompiledChain(unittest.TestCase):
+    """
+    TestCompiledChain
+
+    Unit tests for CompiledChain. The compiled chain must give the same first-match results as
+    calling `handle` on the head of the linked chain.
+    """
+
+    def test_same_results_as_linked_chain(self) -> None:
+        """Every request is routed to the same handler as the linked walk."""
+        low = LowLevelHandler()
+        low.set_next(MidLevelHandler()).set_next(HighLevelHandler())
+        compiled = low.compile()
+
+        self.assertIsInstance(compiled, CompiledChain)
+        self.assertEqual(len(compiled), 3)
+        for request in ["low", "mid", "high", "unknown"]:
+            self.assertEqual(compiled.handle(request), low.handle(request))
+
+    def test_predicate_before_keyed_handler_wins(self) -> None:
+        """A predicate handler earlier in the chain takes priority over a later exact match."""
+        head = StartsWithHandler("mi")
+        head.set_next(MidLevelHandler())
+
+        self.assertEqual(head.compile().handle("mid"), "StartsWithHandler(mi): Handling mid")
+
+    def test_keyed_handler_before_predicate_wins(self) -> None:
+        """An exact match earlier in the chain takes priority over a later predicate handler."""
+        head = MidLevelHandler()
+        head.set_next(StartsWithHandler("mi"))
+        compiled = head.compile()
+
+        self.assertEqual(compiled.handle("mid"), "MidLevelHandler: Handling mid")
+        self.assertEqual(compiled.handle("milk"), "StartsWithHandler(mi): Handling milk")
+
+    def test_opaque_handler_takes_over_rest_of_chain(self) -> None:
+        """A handler overriding `handle` is delegated to, together with everything after it."""
+        low = LowLevelHandler()
+        low.set_next(LegacyHandler()).set_next(HighLevelHandler())
+        compiled = low.compile()
+
+        self.assertEqual(len(compiled), 1)
+        self.assertEqual(compiled.handle("legacy"), "LegacyHandler: Handling legacy")
+        self.assertEqual(compiled.handle("high"), "HighLevelHandler: Handling high")
+        self.assertIsNone(compiled.handle("unknown"))
+
+
+class TestChainExecution(unittest.TestCase):
+    """
+    TestChainExecution
+
+    Unit tests for iterative chain execution and `handle_many` batch routing.
+    """
+
+    def setUp(self) -> None:
+        """Sets up a mixed chain: low -> starts-with 'h' -> legacy -> mid -> high."""
+        self.low = LowLevelHandler()
+        self.low.set_next(StartsWithHandler("h")).set_next(LegacyHandler()).set_next(MidLevelHandler()).set_next(
+            HighLevelHandler()
+        )
+
+    def test_long_chain_does_not_recurse(self) -> None:
+        """A chain far longer than the recursion limit is walked without RecursionError."""
+        head = LowLevelHandler()
+        node: AbstractHandler = head
+        for _ in range(5_000):
+            node = node.set_next(MidLevelHandler())  # type: ignore[assignment]
+        node.set_next(HighLevelHandler())
+
+        self.assertEqual(head.handle("high"), "HighLevelHandler: Handling high")
+        self.assertIsNone(head.handle("unknown"))
+
+    def test_handle_many_matches_handle(self) -> None:
+        """Batch routing returns, in order, the same results as routing each request alone."""
+        requests = ["mid", "high", "legacy", "unknown", "low", "hello", "mid"]
+
+        self.assertEqual(self.low.handle_many(requests), [self.low.handle(request) for request in requests])
+
+    def test_handle_many_empty_batch(self) -> None:
+        """An empty batch returns an empty result list."""
+        self.assertEqual(self.low.handle_many([]), [])
+
+
+class TestAdaptiveChain(unittest.TestCase):
+    """
+    TestAdaptiveChain
+
+    Unit tests for AdaptiveChain. Hot order-independent handlers move forward without changing results.
+    """
+
+    def setUp(self) -> None:
+        """Sets up the chain low -> mid -> high."""
+        self.low = LowLevelHandler()
+        self.mid = MidLevelHandler()
+        self.high = HighLevelHandler()
+        self.low.set_next(self.mid).set_next(self.high)
+
+    def test_hot_handler_moves_to_front(self) -> None:
+        """After a reorder, the most frequently matching handler is probed first."""
+        chain = self.low.adaptive(reorder_interval=4)
+        for request in ["high", "high", "mid", "high"]:
+            self.assertEqual(chain.handle(request), self.low.handle(request))
+
+        self.assertEqual(chain.hit_counts(), [(self.high, 3), (self.mid, 1), (self.low, 0)])
+        self.assertEqual(chain.average_probe_depth(), 2.75)
+        self.assertEqual(chain.handle("high"), "HighLevelHandler: Handling high")
+        self.assertEqual(chain.average_probe_depth(), 2.4)
+
+    def test_order_dependent_handler_is_a_barrier(self) -> None:
+        """Handlers are never moved across a handler that is not order-independent."""
+        prefix = StartsWithHandler("hi")
+        self.mid.set_next(prefix).set_next(self.high)
+        chain = AdaptiveChain(self.low, reorder_interval=1)
+        for _ in range(3):
+            self.assertEqual(chain.handle("high"), "StartsWithHandler(hi): Handling high")
+            self.assertEqual(chain.handle("mid"), "MidLevelHandler: Handling mid")
+
+        self.assertEqual([handler for handler, _ in chain.hit_counts()], [self.mid, self.low, prefix, self.high])
+
+    def test_metrics_before_any_request(self) -> None:
+        """A fresh chain reports zero hits and a zero probe depth."""
+        chain = self.low.adaptive()
+
+        self.assertEqual(len(chain), 3)
+        self.assertEqual(chain.average_probe_depth(), 0.0)
+        self.assertEqual([hits for _, hits in chain.hit_counts()], [0, 0, 0])
+
+    def test_invalid_reorder_interval(self) -> None:
+        """A reorder interval below one is rejected."""
+        with self.assertRaises(ValueError):
+            self.low.adaptive(reorder_interval=0)
+
+
+class TestAsyncChain(unittest.IsolatedAsyncioTestCase):
+    """
+    TestAsyncChain
+
+    Unit tests for AsyncAbstractHandler chains, including sync handlers run on an executor.
+    """
+
+    def setUp(self) -> None:
+        """Sets up the chain: async 'a' -> async 'b' -> low (sync) -> legacy (sync, opaque) -> high (sync)."""
+        self.head = AsyncKeyHandler("a", latency=0.01)
+        second = AsyncKeyHandler("b")
+        low = LowLevelHandler()
+        self.head.set_next(second)
+        second.set_next(low)
+        low.set_next(LegacyHandler()).set_next(HighLevelHandler())
+
+    async def test_mixed_chain(self) -> None:
+        """Async and sync handlers are probed in link order."""
+        self.assertEqual(await self.head.handle("a"), "AsyncKeyHandler(a): Handling a")
+        self.assertEqual(await self.head.handle("low"), "LowLevelHandler: Handling low")
+        self.assertEqual(await self.head.handle("b"), "AsyncKeyHandler(b): Handling b")
+        self.assertEqual(await self.head.handle("legacy"), "LegacyHandler: Handling legacy")
+        self.assertEqual(await self.head.handle("high"), "HighLevelHandler: Handling high")
+        self.assertIsNone(await self.head.handle("unknown"))
+
+    async def test_handle_batch_bounds_concurrency(self) -> None:
+        """Batch results come back in order and no more than `concurrency` requests are in flight."""
+        requests = ["a", "b", "low", "high", "unknown"] * 4
+
+        results = await self.head.handle_batch(requests, concurrency=3)
+
+        self.assertEqual(results, [await self.head.handle(request) for request in requests])
+        self.assertEqual(self.head.peak_in_flight, 3)
+
+    async def test_handle_batch_invalid_concurrency(self) -> None:
+        """A concurrency below one is rejected."""
+        with self.assertRaises(ValueError):
+            await self.head.handle_batch(["a"], concurrency=0)
+
+
+class TestCachedChain(unittest.TestCase):
+    """
+    TestCachedChain
+
+    Unit tests for CachedChain: LRU eviction, TTL expiry, statistics and invalidation on `set_next`.
+    """
+
+    def setUp(self) -> None:
+        """Sets up the chain low -> mid -> high behind a two-entry cache."""
+        self.low = LowLevelHandler()
+        self.mid = MidLevelHandler()
+        self.low.set_next(self.mid).set_next(HighLevelHandler())
+        self.cache = self.low.cached(maxsize=2)
+
+    def test_hits_and_misses(self) -> None:
+        """Repeated requests are served from the cache, including requests no handler accepts."""
+        self.assertEqual(self.cache.handle("mid"), "MidLevelHandler: Handling mid")
+        self.assertEqual(self.cache.handle("mid"), "MidLevelHandler: Handling mid")
+        self.assertIsNone(self.cache.handle("unknown"))
+        self.assertIsNone(self.cache.handle("unknown"))
+
+        self.assertEqual(self.cache.stats(), CacheStats(hits=2, misses=2, evictions=0, invalidations=0, size=2))
+
+    def test_least_recently_used_is_evicted(self) -> None:
+        """Going over maxsize evicts the least recently used request."""
+        self.cache.handle("low")
+        self.cache.handle("mid")
+        self.cache.handle("low")
+        self.cache.handle("high")  # evicts "mid"
+        self.cache.handle("low")
+        self.cache.handle("mid")
+
+        self.assertEqual(self.cache.stats(), CacheStats(hits=2, misses=4, evictions=2, invalidations=0, size=2))
+
+    @patch("src.oop.patterns.behavioral.chain.time.monotonic")
+    def test_ttl_expiry(self, mock_monotonic: MagicMock) -> None:
+        """A cached result is routed again once its TTL has passed."""
+        cache = self.low.cached(ttl=10.0)
+        mock_monotonic.return_value = 100.0
+        cache.handle("low")
+        mock_monotonic.return_value = 109.0
+        cache.handle("low")
+        mock_monotonic.return_value = 110.0
+        cache.handle("low")
+
+        self.assertEqual(cache.stats().hits, 1)
+        self.assertEqual(cache.stats().misses, 2)
+
+    def test_relinking_downstream_invalidates(self) -> None:
+        """Changing a link inside the cached chain clears the cache."""
+        self.assertEqual(self.cache.handle("high"), "HighLevelHandler: Handling high")
+
+        self.mid.set_next(StartsWithHandler("hi"))
+
+        self.assertEqual(self.cache.handle("high"), "StartsWithHandler(hi): Handling high")
+        self.assertEqual(self.cache.stats().invalidations, 1)
+
+    def test_relinking_other_chain_keeps_cache(self) -> None:
+        """Changing links in an unrelated chain keeps the cached results."""
+        self.cache.handle("high")
+
+        LowLevelHandler().set_next(MidLevelHandler())
+        self.cache.handle("high")
+
+        self.assertEqual(self.cache.stats(), CacheStats(hits=1, misses=1, evictions=0, invalidations=0, size=1))
+
+    def test_invalid_settings(self) -> None:
+        """A maxsize below one or a non-positive TTL is rejected."""
+        with self.assertRaises(ValueError):
+            self.low.cached(maxsize=0)
+        with self.assertRaises(ValueError):
+            self.low.cached(ttl=0)
+
+
+class TestMatchHandlers(unittest.TestCase):
+    """
+    TestMatchHandlers
+
+    Unit tests for ExactHandler, PrefixHandler, GlobHandler and RegexHandler, both linked and compiled.
+    """
+
+    def setUp(self) -> None:
+        """Sets up a chain mixing every matcher kind with a predicate handler and an opaque tail."""
+        self.handlers: list[AbstractHandler] = [
+            PrefixHandler("orders.eu.", label="eu-orders"),
+            ExactHandler("orders.us.42"),
+            GlobHandler("orders.*.[!x]?"),
+            RegexHandler(r"orders\.(us|ca)\.\d+"),
+            StartsWithHandler("orders"),
+            RegexHandler(r"(?i)ORDERS\.ASIA\..*"),
+            PrefixHandler("orders."),
+            PrefixHandler(""),
+            LegacyHandler(),
+        ]
+        for current, following in zip(self.handlers, self.handlers[1:]):
+            current.set_next(following)
+        self.head = self.handlers[0]
+
+    def test_matchers(self) -> None:
+        """Each matcher accepts exactly the requests described by its pattern."""
+        self.assertTrue(ExactHandler("a.b").matches("a.b"))
+        self.assertFalse(ExactHandler("a.b").matches("a.bc"))
+        self.assertTrue(PrefixHandler("a.").matches("a.bc"))
+        self.assertTrue(GlobHandler("a.*").matches("a.bc"))
+        self.assertFalse(GlobHandler("a.[!b]*").matches("a.bc"))
+        self.assertTrue(GlobHandler("a?[]x]").matches("a.]"))
+        self.assertTrue(GlobHandler("[!]").matches("[!]"))
+        self.assertTrue(GlobHandler("[!]]").matches("a"))
+        self.assertFalse(GlobHandler("[!]]").matches("]"))
+        self.assertTrue(GlobHandler("a[").matches("a["))
+        self.assertFalse(GlobHandler("a.*").matches("abc"))
+        self.assertTrue(RegexHandler(r"a\.\w+").matches("a.bc"))
+        self.assertFalse(RegexHandler(r"a\.\w").matches("a.bc"))
+
+    def test_regex_literal_prefixes(self) -> None:
+        """Regexes are only tried for requests starting with their literal prefix, whatever their syntax."""
+        head = RegexHandler(r"ab*c")
+        tail = head.set_next(RegexHandler(r"x|ab\.d")).set_next(RegexHandler(r"a\.[.]+"))
+        tail.set_next(RegexHandler(r"a\d+")).set_next(RegexHandler(r"ab[\](]|cd")).set_next(
+            RegexHandler(r"e[]|]|f[^]\]]g|h")
+        )
+        compiled = head.compile()
+
+        for request in ["ac", "abbc", "ab.d", "x", "a...", "a12", "a.d", "b", "ab]", "ab(", "cd", "e|", "fxg", "h"]:
+            self.assertEqual(compiled.handle(request), head.handle(request))
+        self.assertIsNotNone(compiled.handle("ac"))
+        self.assertIsNotNone(compiled.handle("ab.d"))
+        self.assertIsNotNone(compiled.handle("cd"))
+        self.assertIsNotNone(compiled.handle("h"))
+
+    def test_compiled_first_match_is_preserved(self) -> None:
+        """The compiled chain picks the same handler as the linked walk for every request."""
+        compiled = self.head.compile()
+        requests = [
+            "orders.eu.7",
+            "orders.us.42",
+            "orders.us.43",
+            "orders.us.ab",
+            "orders.us.xb",
+            "orders.ca.1",
+            "orders",
+            "orders.asia.1",
+            "ORDERS.ASIA.1",
+            "other",
+            "",
+        ]
+
+        self.assertEqual([compiled.handle(request) for request in requests], self.head.handle_many(requests))
+        for request in requests:
+            self.assertEqual(compiled.handle(request), self.head.handle(request))
+        self.assertEqual(compiled.handle("orders.eu.7"), "eu-orders: Handling orders.eu.7")
+        self.assertEqual(compiled.handle("orders.us.43"), "GlobHandler(orders.*.[!x]?): Handling orders.us.43")
+        self.assertEqual(
+            compiled.handle("ORDERS.ASIA.1"), r"RegexHandler((?i)ORDERS\.ASIA\..*): Handling ORDERS.ASIA.1"
+        )
+        self.assertEqual(compiled.handle("other"), "PrefixHandler(): Handling other")
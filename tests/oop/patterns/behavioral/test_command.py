@@ -1,9 +1,32 @@
 """Module for testing the Command Pattern implementation in an online order system."""
 
+import os
+import pickle
+import queue
+import struct
+import tempfile
+import threading
+import time
 import unittest
+import weakref
+from typing import Optional
 from unittest.mock import MagicMock, patch
 
-from src.oop.patterns.behavioral.command import CancelOrderCommand, Order, OrderInvoker, PlaceOrderCommand
+from src.oop.patterns.behavioral.command import (
+    BloomFilter,
+    CancelOrderCommand,
+    CommandBus,
+    CommandHistory,
+    CommandJournal,
+    CompactCommandStore,
+    IdempotencyFilter,
+    MacroCommand,
+    Order,
+    OrderInvoker,
+    PlaceOrderCommand,
+    coalesce,
+    register_opcode,
+)
 
 
 class TestCommandPattern(unittest.TestCase):
@@ -47,3 +70,551 @@ class TestCommandPattern(unittest.TestCase):
         # Undo the cancel
         self.invoker.press_undo()
         mock_print.assert_called_with("Order has been canceled.")
+
+
+class TestBatchedCommands(unittest.TestCase):
+    """Test case for executing queued commands in one pass, with coalescing."""
+
+    def setUp(self) -> None:
+        """Set up two orders and an invoker."""
+        self.order = MagicMock(spec=Order)
+        self.other = MagicMock(spec=Order)
+        self.invoker = OrderInvoker()
+
+    def test_execute_all_matches_press_button_order(self) -> None:
+        """Commands run in the order repeated press_button calls would run them."""
+        self.invoker.set_command(CancelOrderCommand(self.order))
+        self.invoker.set_command(PlaceOrderCommand(self.other))
+        self.invoker.execute_all()
+
+        self.assertEqual(self.invoker.commands, [])
+        self.assertEqual([type(command) for command in self.invoker.history], [PlaceOrderCommand, CancelOrderCommand])
+        self.other.place.assert_called_once_with()
+        self.order.cancel.assert_called_once_with()
+
+    def test_place_then_cancel_is_coalesced(self) -> None:
+        """A place followed by a cancel of the same order runs neither."""
+        commands = [
+            PlaceOrderCommand(self.order),
+            PlaceOrderCommand(self.other),
+            CancelOrderCommand(self.order),
+        ]
+        for command in reversed(commands):
+            self.invoker.set_command(command)
+        self.invoker.execute_all()
+
+        self.order.place.assert_not_called()
+        self.order.cancel.assert_not_called()
+        self.assertEqual(list(self.invoker.history), [commands[1]])
+
+        self.invoker.press_undo()
+        self.other.cancel.assert_called_once_with()
+        self.assertEqual(list(self.invoker.history), [])
+
+    def test_without_coalescing_everything_runs(self) -> None:
+        """Coalescing can be turned off."""
+        self.invoker.set_command(CancelOrderCommand(self.order))
+        self.invoker.set_command(PlaceOrderCommand(self.order))
+        self.invoker.execute_all(coalesced=False)
+
+        self.assertEqual(len(self.invoker.history), 2)
+
+    def test_nested_pairs_and_cancel_then_place(self) -> None:
+        """Nested pairs collapse, while a cancel followed by a place is kept."""
+        place, cancel = PlaceOrderCommand(self.order), CancelOrderCommand(self.order)
+        self.assertEqual(coalesce([place, place, cancel, cancel]), [])
+        self.assertEqual(coalesce([cancel, place]), [cancel, place])
+
+    def test_macro_command(self) -> None:
+        """A macro runs its coalesced commands in order and undoes them in reverse."""
+        place_other = PlaceOrderCommand(self.other)
+        macro = MacroCommand([PlaceOrderCommand(self.order), place_other, CancelOrderCommand(self.order)])
+        self.assertEqual(macro.commands, [place_other])
+
+        self.invoker.set_command(macro)
+        self.invoker.press_button()
+        self.other.place.assert_called_once_with()
+        self.invoker.press_undo()
+        self.other.cancel.assert_called_once_with()
+
+
+class TestCommandHistory(unittest.TestCase):
+    """Test case for bounded and spilling undo histories."""
+
+    def setUp(self) -> None:
+        """Set up an order and a list of alternating commands."""
+        self.order = Order()
+        self.commands = [
+            PlaceOrderCommand(self.order) if index % 2 == 0 else CancelOrderCommand(self.order) for index in range(6)
+        ]
+
+    def test_ring_buffer_drops_oldest(self) -> None:
+        """A depth-limited history keeps only the newest entries."""
+        history = CommandHistory(max_depth=4)
+        for command in self.commands:
+            history.append(command)
+
+        self.assertEqual(list(history), self.commands[2:])
+        self.assertEqual(history.stats().dropped, 2)
+
+    def test_byte_budget_spills_and_reloads(self) -> None:
+        """Entries over the byte budget spill to disk and pop back in LIFO order, acting on the live order."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "history.seg")
+            history = CommandHistory(max_bytes=0, spill_path=path)
+            for command in self.commands:
+                history.append(command)
+
+            stats = history.stats()
+            self.assertEqual((stats.entries, stats.in_memory, stats.spilled, stats.memory_bytes), (6, 0, 6, 0))
+            self.assertGreater(os.path.getsize(path), 0)
+            self.assertEqual([type(command) for command in history], [type(command) for command in self.commands])
+
+            popped = [history.pop() for _ in range(6)]
+            self.assertEqual([type(command) for command in popped], [type(command) for command in self.commands[::-1]])
+            self.assertTrue(all(command.order is self.order for command in popped))  # type: ignore[attr-defined]
+            self.assertEqual(history.stats().disk_bytes, 0)
+            history.close()
+
+    def test_depth_limit_with_spilled_entries(self) -> None:
+        """The depth limit drops spilled entries first, since they are the oldest."""
+        history = CommandHistory(max_depth=3, max_bytes=200)
+        for command in self.commands:
+            history.append(command)
+
+        self.assertEqual(len(history), 3)
+        self.assertGreater(history.stats().spilled, 0)
+        self.assertEqual([type(command) for command in history], [type(command) for command in self.commands[3:]])
+        history.close()
+
+    def test_dropped_spilled_entries_release_disk_and_receivers(self) -> None:
+        """Dropping spilled entries compacts the segment file and lets their orders be collected."""
+        history = CommandHistory(max_depth=100, max_bytes=0)
+        history.append(PlaceOrderCommand(Order()))
+        record_bytes = history.stats().disk_bytes
+        history.pop()
+        for _ in range(5_000):
+            history.append(PlaceOrderCommand(Order()))
+
+        stats = history.stats()
+        self.assertEqual((stats.entries, stats.spilled, stats.dropped), (100, 100, 4_900))
+        self.assertLessEqual(stats.disk_bytes, 2 * 101 * record_bytes)
+        orders = [weakref.ref(command.order) for command in history]  # type: ignore[attr-defined]
+        for _ in range(1_000):
+            history.append(PlaceOrderCommand(Order()))
+        self.assertTrue(all(order() is None for order in orders))
+        self.assertEqual(len(list(history)), 100)
+        history.close()
+
+    def test_unpicklable_entry_stays_in_memory(self) -> None:
+        """A command that cannot be spilled stays in the history and takes no receiver references."""
+
+        class LocalCommand(PlaceOrderCommand):
+            """Command class that pickle cannot find by name."""
+
+        history = CommandHistory(max_bytes=0)
+        command = LocalCommand(self.order)
+        with self.assertRaises((pickle.PicklingError, AttributeError)):
+            history.append(command)
+        self.assertEqual(list(history), [command])
+        self.assertEqual(history.stats().spilled, 0)
+        self.assertIs(history.pop(), command)
+        history.append(PlaceOrderCommand(self.order))
+        order = weakref.ref(self.order)
+        del self.order, self.commands, command
+        history.pop()
+        self.assertIsNone(order())
+
+    def test_invoker_history_defaults_to_list(self) -> None:
+        """Without a history argument the invoker keeps its history in a plain list."""
+        invoker = OrderInvoker()
+        invoker.set_command(self.commands[0])
+        invoker.press_button()
+        self.assertEqual(invoker.history, [self.commands[0]])
+
+    @patch("builtins.print")
+    def test_invoker_undo_through_spilled_history(self, mock_print: MagicMock) -> None:
+        """press_undo keeps working once history entries have been spilled."""
+        invoker = OrderInvoker(CommandHistory(max_bytes=0))
+        invoker.set_command(PlaceOrderCommand(self.order))
+        invoker.press_button()
+        invoker.set_command(CancelOrderCommand(self.order))
+        invoker.press_button()
+
+        invoker.press_undo()
+        mock_print.assert_called_with("Order has been placed.")
+        invoker.press_undo()
+        mock_print.assert_called_with("Order has been canceled.")
+        self.assertEqual(len(invoker.history), 0)
+
+    def test_pop_empty(self) -> None:
+        """Popping an empty history raises IndexError."""
+        with self.assertRaises(IndexError):
+            CommandHistory().pop()
+
+
+class RecordingOrder(Order):
+    """Order that records its actions, optionally waiting on an event before each one."""
+
+    def __init__(self, log: list[str], name: str, gate: Optional[threading.Event] = None) -> None:
+        super().__init__()
+        self.log = log
+        self.name = name
+        self.gate = gate
+
+    def place(self) -> None:
+        """Record a placement."""
+        if self.gate is not None:
+            self.gate.wait()
+        time.sleep(0.001)
+        self.log.append(f"{self.name}:place")
+
+    def cancel(self) -> None:
+        """Record a cancellation."""
+        if self.gate is not None:
+            self.gate.wait()
+        time.sleep(0.001)
+        self.log.append(f"{self.name}:cancel")
+
+
+class TestCommandBus(unittest.TestCase):
+    """Test case for executing commands on a thread pool."""
+
+    def test_commands_for_same_order_keep_submission_order(self) -> None:
+        """Commands sharing an order run one at a time, in submission order."""
+        log: list[str] = []
+        orders = [RecordingOrder(log, f"order{index}") for index in range(3)]
+        with CommandBus(workers=4) as bus:
+            futures = [
+                bus.submit(PlaceOrderCommand(order) if step % 2 == 0 else CancelOrderCommand(order))
+                for step in range(6)
+                for order in orders
+            ]
+            for future in futures:
+                self.assertIsNone(future.result(timeout=5))
+
+        for order in orders:
+            actions = [entry.split(":")[1] for entry in log if entry.startswith(f"{order.name}:")]
+            self.assertEqual(actions, ["place", "cancel"] * 3)
+
+    def test_backpressure(self) -> None:
+        """Submitting beyond max_pending blocks, or raises queue.Full when not blocking."""
+        gate = threading.Event()
+        bus = CommandBus(workers=1, max_pending=1)
+        first = bus.submit(PlaceOrderCommand(RecordingOrder([], "order", gate)))
+
+        with self.assertRaises(queue.Full):
+            bus.submit(PlaceOrderCommand(RecordingOrder([], "other")), block=False)
+        with self.assertRaises(queue.Full):
+            bus.submit(PlaceOrderCommand(RecordingOrder([], "other")), timeout=0.01)
+
+        gate.set()
+        first.result(timeout=5)
+        bus.submit(PlaceOrderCommand(RecordingOrder([], "other")), timeout=5).result(timeout=5)
+        bus.shutdown()
+
+    def test_exception_is_set_on_future(self) -> None:
+        """A failing command resolves its future with the exception."""
+        order = MagicMock(spec=Order)
+        order.place.side_effect = ValueError("out of stock")
+        with CommandBus(workers=1) as bus:
+            future = bus.submit(PlaceOrderCommand(order))
+            with self.assertRaises(ValueError):
+                future.result(timeout=5)
+
+    def test_submit_after_shutdown(self) -> None:
+        """A shut down bus rejects new commands."""
+        bus = CommandBus()
+        bus.shutdown()
+        with self.assertRaises(RuntimeError):
+            bus.submit(PlaceOrderCommand(Order()))
+
+
+class TestCommandJournal(unittest.TestCase):
+    """Test case for journaling commands and rebuilding state by replay."""
+
+    def setUp(self) -> None:
+        """Set up a temporary journal path."""
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.path = os.path.join(self.directory.name, "orders.journal")
+
+    def tearDown(self) -> None:
+        """Remove the temporary journal."""
+        self.directory.cleanup()
+
+    @patch("builtins.print")
+    def test_replay_rebuilds_orders_and_history(self, _: MagicMock) -> None:
+        """Replaying the journal restores order status and the undo history."""
+        first, second = Order(), Order()
+        with CommandJournal(self.path, commit_window=0.001) as journal:
+            invoker = OrderInvoker(journal=journal)
+            for command in [PlaceOrderCommand(first), PlaceOrderCommand(second), CancelOrderCommand(second)]:
+                invoker.set_command(command)
+                invoker.press_button()
+            invoker.press_undo()
+            journal.flush()
+            self.assertEqual(journal.stats().records, 4)
+
+        restored = OrderInvoker()
+        orders = CommandJournal.replay(self.path, restored)
+
+        self.assertEqual(
+            {order_id: order.status for order_id, order in orders.items()},
+            {
+                first.order_id: "placed",
+                second.order_id: "placed",
+            },
+        )
+        self.assertEqual([type(command) for command in restored.history], [PlaceOrderCommand, PlaceOrderCommand])
+        restored.press_undo()
+        self.assertEqual(orders[second.order_id].status, "canceled")
+
+    def test_group_commit_batches_records(self) -> None:
+        """Records appended within the window share one fsync."""
+        order = Order()
+        with CommandJournal(self.path, commit_window=10.0) as journal:
+            futures = [journal.append(PlaceOrderCommand(order)) for _ in range(100)]
+            journal.flush()
+            for future in futures:
+                self.assertIsNone(future.result(timeout=5))
+            self.assertEqual(journal.stats().commits, 1)
+        self.assertEqual(os.path.getsize(self.path), 100 * 10)
+
+    def test_flush_waits_for_batch_in_flight(self) -> None:
+        """flush waits for a record the writer has already taken but not yet synced."""
+        synced = threading.Event()
+        real_fsync = os.fsync
+
+        def slow_fsync(fd: int) -> None:
+            time.sleep(0.2)
+            real_fsync(fd)
+            synced.set()
+
+        with patch("os.fsync", slow_fsync):
+            with CommandJournal(self.path, commit_window=0) as journal:
+                future = journal.append(PlaceOrderCommand(Order()))
+                time.sleep(0.05)
+                journal.flush()
+                self.assertTrue(future.done())
+                self.assertTrue(synced.is_set())
+
+    @patch("builtins.print")
+    def test_replay_reserves_order_ids(self, _: MagicMock) -> None:
+        """Orders created after a replay, or after an explicit id, get ids above every known one."""
+        with CommandJournal(self.path, commit_window=0) as journal:
+            journal.append(PlaceOrderCommand(Order(10**9)))
+        self.assertGreater(Order().order_id, 10**9)
+        with open(self.path, "ab") as file:
+            file.write(struct.pack("<BBQ", CommandJournal.EXECUTE, 1, 2 * 10**9))
+        CommandJournal.replay(self.path, order_factory=lambda order_id: Order.__new__(Order))
+        self.assertGreater(Order().order_id, 2 * 10**9)
+
+    @patch("builtins.print")
+    def test_truncated_tail_is_ignored(self, _: MagicMock) -> None:
+        """A partially written last record is skipped on replay."""
+        order = Order()
+        with CommandJournal(self.path, commit_window=0) as journal:
+            journal.append(PlaceOrderCommand(order))
+        with open(self.path, "ab") as file:
+            file.write(b"\x00\x02")
+
+        orders = CommandJournal.replay(self.path)
+        self.assertEqual(orders[order.order_id].status, "placed")
+
+    @patch("builtins.print")
+    def test_reopen_after_crash_truncates_torn_record(self, _: MagicMock) -> None:
+        """Reopening drops a torn trailing record, so records appended afterwards replay correctly."""
+        first, second = Order(), Order()
+        with CommandJournal(self.path, commit_window=0) as journal:
+            journal.append(PlaceOrderCommand(first))
+        with open(self.path, "ab") as file:
+            file.write(b"\x00\x02")
+        with CommandJournal(self.path, commit_window=0) as journal:
+            journal.append(PlaceOrderCommand(second))
+            journal.append(CancelOrderCommand(first))
+
+        orders = CommandJournal.replay(self.path)
+        self.assertEqual(os.path.getsize(self.path), 3 * 10)
+        self.assertEqual(
+            {order_id: order.status for order_id, order in orders.items()},
+            {first.order_id: "canceled", second.order_id: "placed"},
+        )
+
+    def test_write_error_is_raised_by_flush_and_close(self) -> None:
+        """A failed batch makes every later flush and close raise, even after later batches succeed."""
+        real_fsync = os.fsync
+        calls = []
+
+        def failing_fsync(fd: int) -> None:
+            calls.append(fd)
+            if len(calls) == 1:
+                raise OSError("disk full")
+            real_fsync(fd)
+
+        with patch("os.fsync", failing_fsync):
+            journal = CommandJournal(self.path, commit_window=0)
+            lost = journal.append(PlaceOrderCommand(Order()))
+            self.assertIsInstance(lost.exception(timeout=5), OSError)
+            journal.append(PlaceOrderCommand(Order())).result(timeout=5)
+            with self.assertRaisesRegex(OSError, "disk full"):
+                journal.flush()
+            with self.assertRaisesRegex(OSError, "disk full"):
+                journal.close()
+
+    def test_unregistered_command(self) -> None:
+        """Commands without an opcode cannot be journaled."""
+        with CommandJournal(self.path) as journal:
+            with self.assertRaises(TypeError):
+                journal.append(MacroCommand([]))
+
+    @patch("builtins.print")
+    def test_unjournalable_command_is_refused_before_running(self, _: MagicMock) -> None:
+        """An invoker with a journal refuses commands it cannot record without running or dropping any."""
+        macro_order, order = Order(), Order()
+        with CommandJournal(self.path, commit_window=0) as journal:
+            invoker = OrderInvoker(journal=journal)
+            invoker.set_command(MacroCommand([PlaceOrderCommand(macro_order)]))
+            invoker.set_command(PlaceOrderCommand(order))
+            with self.assertRaises(TypeError):
+                invoker.execute_all()
+            self.assertEqual((macro_order.status, order.status), ("new", "new"))
+            self.assertEqual(len(invoker.commands), 2)
+            invoker.press_button()
+            with self.assertRaises(TypeError):
+                invoker.press_button()
+            self.assertEqual((macro_order.status, order.status, len(invoker.commands)), ("new", "placed", 1))
+
+    def test_failing_command_keeps_rest_queued(self) -> None:
+        """A command raising during execute_all stays queued with every command after it."""
+        invoker = OrderInvoker()
+        failing = MagicMock(spec=PlaceOrderCommand, idempotency_key=None)
+        failing.coalesce_key.return_value = None
+        failing.execute.side_effect = RuntimeError("boom")
+        later = PlaceOrderCommand(Order())
+        invoker.set_command(later)
+        invoker.set_command(failing)
+        with self.assertRaises(RuntimeError):
+            invoker.execute_all()
+        self.assertEqual(list(invoker.commands), [later, failing])
+
+
+class TestCompactCommandStore(unittest.TestCase):
+    """Test case for storing order commands as fixed-width records."""
+
+    def setUp(self) -> None:
+        """Set up an order and a store with two commands."""
+        self.order = Order()
+        self.store = CompactCommandStore([PlaceOrderCommand(self.order), CancelOrderCommand(self.order)])
+
+    def test_commands_are_materialized_on_read(self) -> None:
+        """Reading a record builds a command of the same type acting on the live order."""
+        self.assertEqual(len(self.store), 2)
+        self.assertEqual(self.store.nbytes(), 18)
+        commands = list(self.store)
+        self.assertEqual([type(command) for command in commands], [PlaceOrderCommand, CancelOrderCommand])
+        self.assertTrue(all(command.order is self.order for command in commands))  # type: ignore[attr-defined]
+
+        command = self.store.pop()
+        self.assertIsInstance(command, CancelOrderCommand)
+        self.assertEqual(len(self.store), 1)
+
+    def test_rejects_second_order_with_same_id(self) -> None:
+        """A different Order object reusing a stored id is refused instead of aliasing the first."""
+        with self.assertRaises(ValueError):
+            self.store.append(PlaceOrderCommand(Order(self.order.order_id)))
+        self.assertEqual(len(self.store), 2)
+
+    def test_orders_are_released_with_their_last_record(self) -> None:
+        """Popping, deleting or overwriting the last record of an order lets the store forget the order."""
+        orders = [Order() for _ in range(5)]
+        self.store.extend([*(PlaceOrderCommand(order) for order in orders), CancelOrderCommand(orders[0])])
+        released = [weakref.ref(order) for order in orders]
+        del orders
+        self.store.pop()
+        self.assertIsNotNone(released[0]())
+        self.store.pop()
+        del self.store[-1]
+        del self.store[-2:]
+        self.store[-1] = CancelOrderCommand(self.order)
+        self.assertEqual([order() for order in released], [None] * 5)
+        self.assertEqual(
+            [type(command) for command in self.store], [PlaceOrderCommand, CancelOrderCommand, CancelOrderCommand]
+        )
+
+    @patch("builtins.print")
+    def test_backs_invoker_commands_and_history(self, mock_print: MagicMock) -> None:
+        """An invoker works unchanged with compact stores for its commands and history."""
+        invoker = OrderInvoker(history=CompactCommandStore(), commands=CompactCommandStore())
+        invoker.set_command(PlaceOrderCommand(self.order))
+        invoker.set_command(CancelOrderCommand(self.order))
+        invoker.press_button()
+        invoker.execute_all()
+        mock_print.assert_called_with("Order has been placed.")
+
+        invoker.press_undo()
+        mock_print.assert_called_with("Order has been canceled.")
+        self.assertEqual(len(invoker.history), 1)
+        self.assertEqual(len(invoker.commands), 0)
+
+    def test_unregistered_commands_are_rejected(self) -> None:
+        """Commands without an opcode cannot be stored, and opcodes cannot be reassigned."""
+        with self.assertRaises(TypeError):
+            self.store.append(MacroCommand([]))
+        with self.assertRaises(ValueError):
+            register_opcode(1, CancelOrderCommand)
+        with self.assertRaises(ValueError):
+            register_opcode(256, CancelOrderCommand)
+
+
+class TestIdempotency(unittest.TestCase):
+    """Test case for dropping commands with repeated idempotency keys."""
+
+    def test_bloom_filter_has_no_false_negatives(self) -> None:
+        """Every added key is reported as present, and the sizing follows the requested rate."""
+        bloom = BloomFilter(capacity=1_000, false_positive_rate=0.01)
+        keys = [f"request-{index}" for index in range(1_000)]
+        for key in keys:
+            bloom.add(key)
+
+        self.assertTrue(all(key in bloom for key in keys))
+        self.assertEqual(bloom.hashes, 7)
+        self.assertEqual(bloom.nbytes(), 1_199)
+        false_positives = sum(f"other-{index}" in bloom for index in range(10_000))
+        self.assertLess(false_positives, 300)
+        self.assertAlmostEqual(bloom.current_false_positive_rate(), 0.01, delta=0.002)
+
+    def test_invoker_drops_duplicate_commands(self) -> None:
+        """A retried command with the same idempotency key is not queued again."""
+        order = Order()
+        invoker = OrderInvoker(dedup=IdempotencyFilter(capacity=100, exact_capacity=10))
+
+        self.assertTrue(invoker.set_command(PlaceOrderCommand(order, idempotency_key="req-1")))
+        self.assertFalse(invoker.set_command(PlaceOrderCommand(order, idempotency_key="req-1")))
+        self.assertTrue(invoker.set_command(CancelOrderCommand(order, idempotency_key="req-2")))
+        self.assertTrue(invoker.set_command(CancelOrderCommand(order)))
+        self.assertTrue(invoker.set_command(CancelOrderCommand(order)))
+
+        self.assertEqual(len(invoker.commands), 4)
+        stats = invoker.dedup.stats()  # type: ignore[union-attr]
+        self.assertEqual((stats.checks, stats.duplicates, stats.exact_keys), (3, 1, 2))
+
+    def test_keys_older_than_exact_window(self) -> None:
+        """Keys evicted from the exact set are uncertain: let through by default, rejected if configured."""
+        lenient = IdempotencyFilter(capacity=100, exact_capacity=2)
+        strict = IdempotencyFilter(capacity=100, exact_capacity=2, reject_uncertain=True)
+        for dedup in (lenient, strict):
+            for key in ["a", "b", "c"]:
+                self.assertFalse(dedup.seen(key))
+
+        self.assertFalse(lenient.seen("a"))
+        self.assertTrue(strict.seen("a"))
+        self.assertEqual(lenient.stats().uncertain, 1)
+        self.assertEqual(strict.stats().duplicates, 1)
+
+    def test_bloom_generations_rotate(self) -> None:
+        """The Bloom front keeps two generations, so its memory stays bounded."""
+        dedup = IdempotencyFilter(capacity=10, exact_capacity=10)
+        for index in range(100):
+            self.assertFalse(dedup.seen(f"key-{index}"))
+        self.assertTrue(dedup.seen("key-99"))
+        self.assertEqual(dedup.stats().bloom_bytes, 2 * BloomFilter(10, 0.001).nbytes())
@@ -1,8 +1,20 @@
 """Module for testing the Iterator Pattern implementation."""
 
+import json
+import os
+import tempfile
 import unittest
+from unittest import mock
 
-from src.oop.patterns.behavioral.iterator import Book, MyBookCollection
+from src.oop.patterns.behavioral.iterator import (
+    Book,
+    BookCollection,
+    BookCursor,
+    ColumnarBookCollection,
+    Iterator,
+    MappedBookCollection,
+    MyBookCollection,
+)
 
 
 class TestMyBookCollection(unittest.TestCase):
@@ -24,3 +36,366 @@ class TestMyBookCollection(unittest.TestCase):
         self.assertEqual(str(self.collection.get_book(0)), "1984 by George Orwell")
         self.assertEqual(str(self.collection.get_book(1)), "To Kill a Mockingbird by Harper Lee")
         self.assertEqual(str(self.collection.get_book(2)), "The Great Gatsby by F. Scott Fitzgerald")
+
+    def test_native_iteration(self) -> None:
+        """Test that the collection supports the for protocol in insertion order."""
+        titles = [book.title for book in self.collection]
+        self.assertEqual(titles, ["1984", "To Kill a Mockingbird", "The Great Gatsby"])
+
+    def test_iterator_matches_native_iteration(self) -> None:
+        """Test that the classic iterator yields the same books as native iteration."""
+        iterator = self.collection.create_iterator()
+        books = []
+        while iterator.has_next():
+            books.append(iterator.next())
+        self.assertEqual(books, list(self.collection))
+
+    def test_iter_batches(self) -> None:
+        """Test that batches are consecutive slices of the requested size."""
+        batches = [[book.title for book in batch] for batch in self.collection.iter_batches(2)]
+        self.assertEqual(batches, [["1984", "To Kill a Mockingbird"], ["The Great Gatsby"]])
+        with self.assertRaises(ValueError):
+            next(self.collection.iter_batches(0))
+
+
+class ListIterator(Iterator):
+    """Iterator over a plain list of books."""
+
+    def __init__(self, books: list[Book]) -> None:
+        self._books = iter(books)
+        self._next = next(self._books, None)
+
+    def next(self) -> Book:
+        """Return the next book."""
+        book, self._next = self._next, next(self._books, None)
+        assert book is not None
+        return book
+
+    def has_next(self) -> bool:
+        """Check if there are more books."""
+        return self._next is not None
+
+
+class IteratorOnlyCollection(BookCollection):
+    """Collection that, like older aggregates, only implements create_iterator."""
+
+    def __init__(self, books: list[Book]) -> None:
+        self.books = books
+
+    def create_iterator(self) -> Iterator:
+        """Create an iterator over the list of books."""
+        return ListIterator(self.books)
+
+
+class TestBookCollectionDefaults(unittest.TestCase):
+    """Test case for the BookCollection methods built on create_iterator."""
+
+    def test_iterator_only_collection(self) -> None:
+        """Test that a collection with only create_iterator supports iteration, batches and sorting."""
+        books = [Book("b", "x"), Book("a", "y"), Book("c", "z")]
+        collection = IteratorOnlyCollection(books)
+        self.assertEqual(list(collection), books)
+        self.assertEqual(list(collection.iter_batches(2)), [books[:2], books[2:]])
+        sorted_books = collection.sorted_iterator()
+        self.assertEqual([sorted_books.next() for _ in range(3)], sorted(books, key=lambda book: book.title))
+
+
+class TestIndexedBookCollection(unittest.TestCase):
+    """Test case for the secondary indexes of MyBookCollection."""
+
+    BOOKS = [
+        ("The Hobbit", "J. R. R. Tolkien"),
+        ("1984", "George Orwell"),
+        ("The Silmarillion", "J. R. R. Tolkien"),
+        ("Animal Farm", "George Orwell"),
+        ("The Hobbit", "Someone Else"),
+        ("Homage to Catalonia", "George Orwell"),
+    ]
+
+    def setUp(self) -> None:
+        """Set up an indexed collection and a scanning one with the same books."""
+        self.indexed = MyBookCollection(indexed=True)
+        self.scanned = MyBookCollection()
+        for title, author in self.BOOKS:
+            self.indexed.add_book(Book(title, author))
+            self.scanned.add_book(Book(title, author))
+
+    def test_by_author(self) -> None:
+        """Test that author lookups return the author's books in insertion order."""
+        for collection in (self.indexed, self.scanned):
+            titles = [book.title for book in collection.by_author("George Orwell")]
+            self.assertEqual(titles, ["1984", "Animal Farm", "Homage to Catalonia"])
+            self.assertEqual(list(collection.by_author("Nobody")), [])
+
+    def test_title_prefix(self) -> None:
+        """Test that prefix lookups return matching books in title order, ties in insertion order."""
+        for collection in (self.indexed, self.scanned):
+            books = [str(book) for book in collection.title_prefix("The ")]
+            self.assertEqual(
+                books,
+                [
+                    "The Hobbit by J. R. R. Tolkien",
+                    "The Hobbit by Someone Else",
+                    "The Silmarillion by J. R. R. Tolkien",
+                ],
+            )
+            self.assertEqual(len(list(collection.title_prefix(""))), len(self.BOOKS))
+            self.assertEqual(list(collection.title_prefix("Zz")), [])
+
+    def test_title_range(self) -> None:
+        """Test that range lookups are half-open and ordered by title."""
+        for collection in (self.indexed, self.scanned):
+            titles = [book.title for book in collection.title_range("Animal Farm", "The Hobbit")]
+            self.assertEqual(titles, ["Animal Farm", "Homage to Catalonia"])
+
+    def test_index_tracks_additions(self) -> None:
+        """Test that books added after a query are visible to the next query."""
+        self.indexed.add_book(Book("Burmese Days", "George Orwell"))
+        self.assertEqual(len(list(self.indexed.by_author("George Orwell"))), 4)
+        self.assertEqual([book.title for book in self.indexed.title_prefix("Bur")], ["Burmese Days"])
+
+    def test_interleaved_adds_and_queries(self) -> None:
+        """Test that additions merged one by one or in a run past the insort limit keep the title order."""
+        for batch in (1, 3, MyBookCollection._INSORT_LIMIT + 1):  # pylint: disable=protected-access
+            for index in range(batch):
+                book = Book(f"T{index * 7919 % 13}", f"batch {batch}")
+                self.indexed.add_book(book)
+                self.scanned.add_book(book)
+            self.assertEqual(list(self.indexed.title_prefix("")), list(self.scanned.title_prefix("")))
+
+
+class TestPagination(unittest.TestCase):
+    """Test case for keyset pagination of MyBookCollection."""
+
+    def setUp(self) -> None:
+        """Set up an indexed and an unindexed collection with duplicate titles."""
+        self.collections = [MyBookCollection(indexed=True), MyBookCollection()]
+        for index in range(25):
+            for collection in self.collections:
+                collection.add_book(Book(f"Title {index % 10}", f"Author {index}"))
+
+    @staticmethod
+    def pages(collection: MyBookCollection, size: int) -> list[list[str]]:
+        """Walk every page and return the authors on each."""
+        pages, cursor = [], None
+        while True:
+            page = collection.page(cursor, size)
+            pages.append([book.author for book in page.books])
+            if page.next_cursor is None:
+                return pages
+            cursor = page.next_cursor
+
+    def test_pages_cover_books_in_keyset_order(self) -> None:
+        """Test that pages follow (title, position) order without gaps or repeats."""
+        expected = [f"Author {index}" for index in sorted(range(25), key=lambda index: (index % 10, index))]
+        for collection in self.collections:
+            pages = self.pages(collection, 10)
+            self.assertEqual([len(page) for page in pages], [10, 10, 5])
+            self.assertEqual(sum(pages, []), expected)
+            self.assertEqual(self.pages(collection, 25), [expected])
+
+    def test_resume_after_concurrent_additions(self) -> None:
+        """Test that books added between pages neither shift nor repeat the remaining pages."""
+        for collection in self.collections:
+            first = collection.page(size=5)
+            collection.add_book(Book("Title 0", "Early"))
+            collection.add_book(Book("Title 9", "Late"))
+            rest = [book.author for book in collection.page(first.next_cursor, 100).books]
+            self.assertNotIn("Early", rest)
+            self.assertEqual(rest[-1], "Late")
+            self.assertFalse(set(rest) & {book.author for book in first.books})
+
+    def test_unindexed_collection_keeps_title_index_after_page(self) -> None:
+        """Test that paging an unindexed collection builds a title index that later additions keep current."""
+        collection = self.collections[1]
+        collection.page(size=1)
+        collection.add_book(Book("A first", "New"))
+        collection.add_book(Book("Title 3", "New"))
+        self.assertEqual(collection.page(size=1).books, [Book("A first", "New")])
+        self.assertEqual([book.author for book in collection.title_prefix("Title 3")][-1], "New")
+        self.assertEqual(len(list(collection.by_author("New"))), 2)
+
+    def test_cursor_is_serializable(self) -> None:
+        """Test that a cursor round-trips through its token and bad tokens are rejected."""
+        cursor = BookCursor("Tïtle / 1", 42)
+        self.assertEqual(BookCursor.decode(cursor.encode()), cursor)
+        for token in ("not base64!", BookCursor("x", 1).encode()[:-4], "WzEsMl0="):
+            with self.assertRaises(ValueError):
+                self.collections[0].page(token)
+        with self.assertRaises(ValueError):
+            self.collections[0].page(size=0)
+
+
+class TestSortedIterator(unittest.TestCase):
+    """Test case for the external merge sort behind sorted_iterator."""
+
+    def setUp(self) -> None:
+        """Set up a collection in pseudo-random title order."""
+        self.collection = ColumnarBookCollection()
+        for index in range(2_000):
+            self.collection.add_book(Book(f"Title {index * 7919 % 2_000:04d}", f"Author {index % 13}"))
+
+    @staticmethod
+    def drain(iterator: Iterator) -> list[Book]:
+        """Collect the books of a classic iterator."""
+        books = []
+        while iterator.has_next():
+            books.append(iterator.next())
+        return books
+
+    def test_spills_runs_under_memory_limit(self) -> None:
+        """Test that a small memory limit spills several runs and still yields books in order."""
+        iterator = self.collection.sorted_iterator(memory_limit=16_384)
+        books = self.drain(iterator)
+        self.assertGreater(iterator.runs, 1)
+        self.assertEqual(books, sorted(self.collection, key=lambda book: book.title))
+        with self.assertRaises(IndexError):
+            iterator.next()
+
+    def test_in_memory_sort_and_stability(self) -> None:
+        """Test a custom key sorted in memory keeps insertion order among equal keys."""
+        iterator = self.collection.sorted_iterator(key=lambda book: book.author)
+        books = self.drain(iterator)
+        self.assertEqual(iterator.runs, 0)
+        self.assertEqual(books, sorted(self.collection, key=lambda book: book.author))
+
+    def test_close_and_limits(self) -> None:
+        """Test that closing early ends iteration and that the memory limit must be positive."""
+        iterator = self.collection.sorted_iterator(memory_limit=16_384)
+        iterator.next()
+        iterator.close()
+        self.assertFalse(iterator.has_next())
+        with self.assertRaises(ValueError):
+            self.collection.sorted_iterator(memory_limit=0)
+
+
+class TestColumnarBookCollection(unittest.TestCase):
+    """Test case for ColumnarBookCollection."""
+
+    def setUp(self) -> None:
+        """Set up matching columnar and list-backed collections."""
+        self.books = [
+            Book("1984", "George Orwell"),
+            Book("Animal Farm", "George Orwell"),
+            Book("Cien años de soledad", "Gabriel García Márquez"),
+        ]
+        self.reference = MyBookCollection()
+        self.collection = ColumnarBookCollection()
+        for book in self.books:
+            self.reference.add_book(book)
+            self.collection.add_book(book)
+
+    def test_matches_list_backend(self) -> None:
+        """Test that every access path yields the same books as MyBookCollection."""
+        self.assertEqual(len(self.collection), len(self.reference))
+        self.assertEqual(list(self.collection), list(self.reference))
+        self.assertEqual([self.collection.get_book(i) for i in range(3)], self.books)
+        self.assertEqual(self.collection.get_book(-1), self.books[-1])
+        iterator = self.collection.create_iterator()
+        books = []
+        while iterator.has_next():
+            books.append(iterator.next())
+        self.assertEqual(books, self.books)
+        self.assertEqual(list(self.collection.iter_batches(2)), list(self.reference.iter_batches(2)))
+
+    def test_book_views_compare_by_value(self) -> None:
+        """Test that fresh views equal the stored book, and that mutable books cannot be hashed."""
+        self.assertIsNot(self.collection.get_book(0), self.collection.get_book(0))
+        self.assertEqual(self.collection.get_book(0), self.books[0])
+        with self.assertRaises(TypeError):
+            hash(self.books[0])
+
+    def test_authors_are_interned(self) -> None:
+        """Test that repeated authors are stored once and come back as the same string."""
+        self.assertIs(self.collection.get_book(0).author, self.collection.get_book(1).author)
+        self.assertEqual(self.collection.nbytes(), len("1984Animal FarmCien años de soledad".encode()) + 3 * 4 + 3 * 4)
+
+    def test_out_of_range(self) -> None:
+        """Test that indexing past the end raises IndexError."""
+        with self.assertRaises(IndexError):
+            self.collection.get_book(3)
+
+    def test_indexed_queries_and_pages(self) -> None:
+        """Test that a columnar collection answers author, title and page queries like the list backend."""
+        indexed = MyBookCollection(indexed=True, columnar=True)
+        for book in self.books:
+            indexed.add_book(book)
+        self.assertEqual(list(indexed.by_author("George Orwell")), self.books[:2])
+        self.assertEqual(list(indexed.title_prefix("A")), [self.books[1]])
+        self.assertEqual(list(indexed.title_range("1984", "B")), self.books[:2])
+        page = indexed.page(size=2)
+        self.assertEqual(page.books, self.reference.page(size=2).books)
+        self.assertEqual(indexed.page(page.next_cursor).books, [self.books[2]])
+
+
+class TestMappedBookCollection(unittest.TestCase):
+    """Test case for MappedBookCollection."""
+
+    BOOKS = [
+        Book("1984", "George Orwell"),
+        Book("Dune, Part One", "Frank Herbert"),
+        Book("Ficciones", "Jorge Luis Borges"),
+    ]
+
+    def setUp(self) -> None:
+        """Create a scratch directory for catalogs."""
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name: str, text: str) -> str:
+        """Write a catalog file and return its path."""
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8", newline="") as catalog:
+            catalog.write(text)
+        return path
+
+    def jsonl(self) -> str:
+        """Write the test books as JSONL, with a blank line and no trailing newline."""
+        lines = [json.dumps({"author": book.author, "title": book.title}) for book in self.BOOKS]
+        return self.write("books.jsonl", lines[0] + "\n\n" + "\n".join(lines[1:]))
+
+    def test_jsonl(self) -> None:
+        """Test random access, native iteration and the classic iterator over JSONL."""
+        with MappedBookCollection(self.jsonl()) as collection:
+            self.assertEqual(len(collection), 3)
+            self.assertEqual(collection.get_book(1), self.BOOKS[1])
+            self.assertEqual(collection.get_book(-1), self.BOOKS[2])
+            self.assertEqual(list(collection), self.BOOKS)
+            iterator = collection.create_iterator()
+            books = []
+            while iterator.has_next():
+                books.append(iterator.next())
+            self.assertEqual(books, self.BOOKS)
+
+    def test_csv(self) -> None:
+        """Test that CSV columns are located by the header and quoted fields are parsed."""
+        path = self.write("books.csv", 'author,title\r\nGeorge Orwell,1984\r\nFrank Herbert,"Dune, Part One"\r\n')
+        with MappedBookCollection(path) as collection:
+            self.assertEqual(list(collection), self.BOOKS[:2])
+
+    def test_index_is_persisted(self) -> None:
+        """Test that a second open loads the saved index instead of scanning."""
+        path = self.jsonl()
+        with MappedBookCollection(path):
+            pass
+        self.assertTrue(os.path.exists(f"{path}.idx"))
+        with mock.patch.object(MappedBookCollection, "_build_index", side_effect=AssertionError("rescanned")):
+            with MappedBookCollection(path) as collection:
+                self.assertEqual(collection.get_book(2), self.BOOKS[2])
+
+    def test_stale_index_is_rebuilt(self) -> None:
+        """Test that changing the catalog invalidates the saved index."""
+        path = self.jsonl()
+        with MappedBookCollection(path):
+            pass
+        with open(path, "a", encoding="utf-8") as catalog:
+            catalog.write('\n{"title": "Emma", "author": "Jane Austen"}\n')
+        with MappedBookCollection(path) as collection:
+            self.assertEqual(collection.get_book(3), Book("Emma", "Jane Austen"))
+
+    def test_rejects_unknown_format(self) -> None:
+        """Test that unsupported formats and headers are rejected."""
+        with self.assertRaises(ValueError):
+            MappedBookCollection(self.write("books.txt", "x"))
+        with self.assertRaises(ValueError):
+            MappedBookCollection(self.write("books.csv", "name,writer\n"))
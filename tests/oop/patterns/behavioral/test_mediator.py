@@ -1,9 +1,85 @@
 """Tests for Mediator Pattern in a Chat Application"""
 
+import asyncio
+import os
+import threading
 import unittest
+from typing import Sequence
 from unittest.mock import MagicMock, patch
 
-from src.oop.patterns.behavioral.mediator import ChatRoom, User
+from src.oop.patterns.behavioral.mediator import (
+    AsyncChatRoom,
+    BufferedChatRoom,
+    ChatRoom,
+    Colleague,
+    Mediator,
+    MessageHistory,
+    ShardedChatRoom,
+    TopicMediator,
+    User,
+)
+
+
+class Recorder(Colleague):
+    """Colleague that records what it receives."""
+
+    def __init__(self, mediator: Mediator) -> None:
+        super().__init__(mediator)
+        self.received: list[str] = []
+
+    def send(self, message: str) -> None:
+        """Send a message through the mediator."""
+        self.mediator.send(message, self)
+
+    def receive(self, message: str) -> None:
+        """Record the message."""
+        self.received.append(message)
+
+
+class BatchRecorder(Recorder):
+    """Recorder that also records each batch it receives."""
+
+    def __init__(self, mediator: Mediator) -> None:
+        super().__init__(mediator)
+        self.batches: list[list[str]] = []
+        self.delivered = threading.Event()
+
+    def receive_batch(self, messages: Sequence[str]) -> None:
+        """Record the batch and its messages."""
+        self.batches.append(list(messages))
+        self.received.extend(messages)
+        self.delivered.set()
+
+
+class FailingRecorder(Recorder):
+    """Recorder whose receive always raises."""
+
+    def receive(self, message: str) -> None:
+        """Fail to receive the message."""
+        raise RuntimeError(message)
+
+
+class ExitingRecorder(Recorder):
+    """Recorder that ends its process when it receives a message."""
+
+    def receive(self, message: str) -> None:
+        """Exit the process without cleanup."""
+        os._exit(3)  # pylint: disable=protected-access
+
+
+class GatedRecorder(Recorder):
+    """Recorder whose asynchronous receipt waits until its gate opens."""
+
+    def __init__(self, mediator: Mediator) -> None:
+        super().__init__(mediator)
+        self.gate = asyncio.Event()
+
+    async def receive_async(self, message: str) -> None:
+        """Wait for the gate, then record the message."""
+        await self.gate.wait()
+        if message == "boom":
+            raise RuntimeError(message)
+        self.receive(message)
 
 
 class TestMediatorPattern(unittest.TestCase):
@@ -48,3 +124,395 @@ class TestMediatorPattern(unittest.TestCase):
         # Check that Alice did not receive her own message
         calls = [call[0][0] for call in mock_print.call_args_list]
         self.assertNotIn("Alice: Received message: Hello everyone!", calls)
+
+
+class TestChatRoomMembership(unittest.TestCase):
+    """Unit tests for indexed ChatRoom membership."""
+
+    def setUp(self) -> None:
+        """Set up a room with four recorders."""
+        self.room = ChatRoom()
+        self.members = [Recorder(self.room) for _ in range(4)]
+        for member in self.members:
+            self.room.add_colleague(member)
+
+    def test_duplicate_join_is_ignored(self) -> None:
+        """Test that adding a member twice does not duplicate deliveries."""
+        self.room.add_colleague(self.members[1])
+        self.assertEqual(len(self.room), 4)
+        self.members[0].send("hi")
+        self.assertEqual([member.received for member in self.members], [[], ["hi"], ["hi"], ["hi"]])
+
+    def test_leave_by_colleague_or_id(self) -> None:
+        """Test that members can leave by object or id and stop receiving."""
+        self.room.remove_colleague(self.members[1])
+        self.room.remove_colleague(self.members[3].colleague_id)
+        self.room.remove_colleague(self.members[3])
+        self.assertNotIn(self.members[1], self.room)
+        self.assertIn(self.members[2], self.room)
+        self.assertEqual(self.room.colleagues, (self.members[0], self.members[2]))
+        self.members[2].send("still here")
+        self.assertEqual([member.received for member in self.members], [["still here"], [], [], []])
+
+    def test_colleagues_is_read_only(self) -> None:
+        """Test that the colleagues snapshot cannot be mutated in place to join the room."""
+        with self.assertRaises(AttributeError):
+            self.room.colleagues.append(Recorder(self.room))  # type: ignore[attr-defined]  # pylint: disable=no-member
+        self.assertEqual(len(self.room), 4)
+
+    def test_sender_skipped_after_reordering(self) -> None:
+        """Test that the sender is skipped after a leave moved it to another slot."""
+        self.room.remove_colleague(self.members[0])
+        self.members[3].send("moved")
+        self.assertEqual([member.received for member in self.members], [[], ["moved"], ["moved"], []])
+
+    def test_non_member_reaches_everyone(self) -> None:
+        """Test that a message from outside the room reaches every member."""
+        Recorder(self.room).send("from outside")
+        self.assertEqual([member.received for member in self.members], [["from outside"]] * 4)
+
+
+class TestMessageHistory(unittest.TestCase):
+    """Unit tests for the bounded message history and late-joiner replay."""
+
+    def test_bounds(self) -> None:
+        """Test that the history keeps the newest messages within its count and byte bounds."""
+        history = MessageHistory(max_messages=3, max_bytes=10)
+        for index, message in enumerate(["aaaa", "bbbb", "cc", "dd", "é"]):
+            self.assertEqual(history.append(message, 0), index)
+        self.assertEqual((history.first_seq, history.next_seq, len(history), history.nbytes()), (2, 5, 3, 6))
+        self.assertEqual(history.read(0, 10), (2, [(0, "cc"), (0, "dd"), (0, "é")]))
+        self.assertEqual(history.read(3, 1), (3, [(0, "dd")]))
+        self.assertEqual(history.read(2, 10, until=4), (2, [(0, "cc"), (0, "dd")]))
+        history.append("x" * 11, 0)
+        self.assertEqual((len(history), history.nbytes()), (0, 0))
+
+    def test_late_joiner_replay(self) -> None:
+        """Test that a late joiner is replayed others' messages in batches, then gets live traffic."""
+        room = ChatRoom(history=MessageHistory(max_messages=5))
+        early, late = Recorder(room), BatchRecorder(room)
+        room.add_colleague(early)
+        room.add_colleague(late)
+        for index in range(7):
+            (early if index % 3 else late).send(f"m{index}")
+        room.remove_colleague(late)
+        late.received.clear()
+        room.add_colleague(late, replay_from=0)
+        early.send("live")
+        self.assertEqual(late.batches[-1:], [["m2", "m4", "m5"]])
+        self.assertEqual(late.received, ["m2", "m4", "m5", "live"])
+
+    def test_live_messages_wait_for_replay(self) -> None:
+        """Test that a message sent while a late joiner is replayed reaches it after the replayed ones."""
+        room = ChatRoom(history=MessageHistory())
+        early, late = Recorder(room), BatchRecorder(room)
+        room.add_colleague(early)
+        early.send("old")
+
+        def reply_then_record(messages: Sequence[str]) -> None:
+            early.send("reply")
+            late.received.extend(messages)
+
+        with patch.object(late, "receive_batch", side_effect=reply_then_record):
+            room.add_colleague(late, replay_from=0)
+        self.assertEqual(late.received, ["old", "reply"])
+        early.send("live")
+        self.assertEqual(late.received[-1], "live")
+
+    def test_send_from_another_thread_during_replay(self) -> None:
+        """Test that a message another thread sends while a late joiner is replayed is delivered after it."""
+        room = ChatRoom(history=MessageHistory())
+        early, late = Recorder(room), BatchRecorder(room)
+        room.add_colleague(early)
+        early.send("old")
+
+        def send_from_thread_then_record(messages: Sequence[str]) -> None:
+            sender = threading.Thread(target=early.send, args=("threaded",))
+            sender.start()
+            sender.join()
+            late.received.extend(messages)
+
+        with patch.object(late, "receive_batch", side_effect=send_from_thread_then_record):
+            room.add_colleague(late, replay_from=0)
+        self.assertEqual(late.received, ["old", "threaded"])
+
+    def test_failed_replay_leaves_the_room(self) -> None:
+        """Test that a join whose replay fails, or that asks a room without history for a replay, is undone."""
+        without_history = ChatRoom()
+        joiner = Recorder(without_history)
+        with self.assertRaises(RuntimeError):
+            without_history.add_colleague(joiner, replay_from=0)
+        self.assertNotIn(joiner, without_history)
+        room = ChatRoom(history=MessageHistory())
+        early, late = Recorder(room), BatchRecorder(room)
+        room.add_colleague(early)
+        early.send("old")
+        with patch.object(late, "receive_batch", side_effect=ValueError("bad batch")):
+            with self.assertRaises(ValueError):
+                room.add_colleague(late, replay_from=0)
+        self.assertNotIn(late, room)
+        room.add_colleague(late)
+        early.send("new")
+        self.assertEqual(late.received, ["new"])
+
+    def test_replay_batches(self) -> None:
+        """Test explicit replay in batches and its preconditions."""
+        room = ChatRoom(history=MessageHistory())
+        sender, reader = Recorder(room), BatchRecorder(room)
+        for index in range(5):
+            sender.send(f"m{index}")
+        self.assertEqual(room.replay(reader, 1, batch_size=2), 5)
+        self.assertEqual(reader.batches, [["m1", "m2"], ["m3", "m4"]])
+        with self.assertRaises(RuntimeError):
+            ChatRoom().replay(reader, 0)
+
+
+class TestBufferedChatRoom(unittest.TestCase):
+    """Unit tests for batched delivery."""
+
+    def room(self, window: float, max_batch: int = 1_024) -> tuple[BufferedChatRoom, BatchRecorder, Recorder]:
+        """Return a room with a batch-aware member and a plain one."""
+        room = BufferedChatRoom(window, max_batch)
+        self.addCleanup(room.close)
+        batcher, plain = BatchRecorder(room), Recorder(room)
+        room.add_colleague(batcher)
+        room.add_colleague(plain)
+        return room, batcher, plain
+
+    def test_count_flush_skips_own_messages(self) -> None:
+        """Test that a full batch is delivered in one call per member, without the member's own messages."""
+        _, batcher, plain = self.room(window=60, max_batch=3)
+        plain.send("a")
+        batcher.send("b")
+        self.assertEqual(batcher.batches, [])
+        plain.send("c")
+        self.assertEqual(batcher.batches, [["a", "c"]])
+        self.assertEqual(plain.received, ["b"])
+
+    def test_window_flush(self) -> None:
+        """Test that pending messages are delivered once the window passes."""
+        _, batcher, plain = self.room(window=0.05)
+        plain.send("a")
+        plain.send("b")
+        self.assertTrue(batcher.delivered.wait(5))
+        self.assertEqual(batcher.batches, [["a", "b"]])
+
+    def test_zero_window_delivers_immediately(self) -> None:
+        """Test that a zero window delivers each message as it is sent."""
+        _, batcher, plain = self.room(window=0)
+        plain.send("a")
+        plain.send("b")
+        self.assertEqual(batcher.batches, [["a"], ["b"]])
+
+    def test_close_flushes(self) -> None:
+        """Test that closing delivers pending messages and rejects later sends."""
+        room, batcher, plain = self.room(window=60)
+        batcher.send("a")
+        batcher.send("b")
+        room.close()
+        self.assertEqual(plain.received, ["a", "b"])
+        with self.assertRaises(RuntimeError):
+            plain.send("late")
+
+    def test_failing_member_does_not_stop_the_flush_thread(self) -> None:
+        """Test that a raising receive_batch is counted and later windows still flush to everyone."""
+        room, batcher, plain = self.room(window=0.01)
+        failing = MagicMock(spec=Colleague, colleague_id=-1)
+        failing.receive_batch.side_effect = RuntimeError("boom")
+        room.add_colleague(failing)
+        plain.send("a")
+        self.assertTrue(batcher.delivered.wait(5))
+        batcher.delivered.clear()
+        plain.send("b")
+        self.assertTrue(batcher.delivered.wait(5))
+        room.close()
+        self.assertEqual(batcher.batches, [["a"], ["b"]])
+        self.assertEqual(room.failed, 2)
+
+
+class TestShardedChatRoom(unittest.TestCase):
+    """Unit tests for the multi-process sharded chat room."""
+
+    def test_delivers_across_shards_in_sender_order(self) -> None:
+        """Test that every other member receives each sender's messages in order, whatever its shard."""
+        room = ShardedChatRoom(workers=3)
+        members = [Recorder(room) for _ in range(5)]
+        for member in members:
+            room.add_colleague(member)
+        room.add_colleague(members[0])
+        with room:
+            for index in range(20):
+                members[index % 2].send(f"{index % 2}:{index}")
+        received = {member.colleague_id: member.received for member in room.colleagues if isinstance(member, Recorder)}
+        zeros = [f"0:{index}" for index in range(0, 20, 2)]
+        ones = [f"1:{index}" for index in range(1, 20, 2)]
+        self.assertEqual(len(received), 5)
+        self.assertEqual(received[members[0].colleague_id], ones)
+        self.assertEqual(received[members[1].colleague_id], zeros)
+        for member in members[2:]:
+            messages = received[member.colleague_id]
+            self.assertEqual([message for message in messages if message.startswith("0:")], zeros)
+            self.assertEqual([message for message in messages if message.startswith("1:")], ones)
+        self.assertIs(room.colleagues[0].mediator, room)
+
+    def test_failing_receivers_are_counted(self) -> None:
+        """Test that receive errors in a shard are counted and the shard still hands its colleagues back."""
+        room = ShardedChatRoom(workers=2)
+        members = [FailingRecorder(room), FailingRecorder(room), Recorder(room)]
+        for member in members:
+            room.add_colleague(member)
+        with room:
+            members[2].send("boom")
+        self.assertEqual(room.failed, 2)
+        self.assertEqual(len(room.colleagues), 3)
+
+    def test_dead_shard_is_reported(self) -> None:
+        """Test that close raises instead of hanging when a shard process dies."""
+        room = ShardedChatRoom(workers=2)
+        members = [ExitingRecorder(room), Recorder(room), Recorder(room)]
+        for member in members:
+            room.add_colleague(member)
+        room.start()
+        members[1].send("exit")
+        with self.assertRaisesRegex(RuntimeError, "shard 0: 3"):
+            room.close()
+        self.assertEqual(len(room.colleagues), 3)
+
+    def test_lifecycle(self) -> None:
+        """Test that sends need a running room and members must join before it starts."""
+        room = ShardedChatRoom(workers=1)
+        member = Recorder(room)
+        room.add_colleague(member)
+        with self.assertRaises(RuntimeError):
+            member.send("too early")
+        with room:
+            with self.assertRaises(RuntimeError):
+                room.add_colleague(Recorder(room))
+        with self.assertRaises(RuntimeError):
+            member.send("too late")
+        with self.assertRaises(ValueError):
+            ShardedChatRoom(workers=0)
+
+
+class TestTopicMediator(unittest.TestCase):
+    """Unit tests for topic routing with wildcard subscriptions."""
+
+    def setUp(self) -> None:
+        """Set up subscribers to exact topics and wildcard patterns."""
+        self.mediator = TopicMediator()
+        self.eu_orders, self.books, self.everything, self.other = (Recorder(self.mediator) for _ in range(4))
+        self.mediator.subscribe(self.eu_orders, "orders.*.eu")
+        self.mediator.subscribe(self.books, "orders.book.eu")
+        self.mediator.subscribe(self.books, "orders.book.*")
+        self.mediator.subscribe(self.everything, "*.*.*")
+        self.mediator.subscribe(self.other, "payments.card.eu")
+
+    def test_routes_to_matching_subscribers_once(self) -> None:
+        """Test that only matching subscribers receive, once each, and the sender is skipped."""
+        self.assertEqual(self.mediator.publish("orders.book.eu", "m1"), 3)
+        self.mediator.send("m2", self.everything, topic="orders.book.us")
+        self.mediator.publish("orders.pen.eu", "m3")
+        self.mediator.publish("orders.book", "m4")
+        self.assertEqual(self.eu_orders.received, ["m1", "m3"])
+        self.assertEqual(self.books.received, ["m1", "m2"])
+        self.assertEqual(self.everything.received, ["m1", "m3"])
+        self.assertEqual(self.other.received, [])
+
+    def test_unsubscribe_prunes(self) -> None:
+        """Test that unsubscribing stops delivery and duplicate subscriptions are counted once."""
+        self.mediator.subscribe(self.other, "payments.card.eu")
+        self.assertEqual(len(self.mediator), 5)
+        self.mediator.unsubscribe(self.other, "payments.card.eu")
+        self.mediator.unsubscribe(self.other, "payments.card.eu")
+        self.mediator.unsubscribe(self.books, "orders.book.*")
+        self.assertEqual(len(self.mediator), 3)
+        self.mediator.publish("payments.card.eu", "pay")
+        self.mediator.publish("orders.book.us", "us")
+        self.assertEqual(self.other.received, [])
+        self.assertEqual(self.books.received, [])
+        self.assertEqual(self.everything.received, ["pay", "us"])
+
+    def test_invalid_topics(self) -> None:
+        """Test that empty segments are rejected in patterns, publish topics and the default topic."""
+        with self.assertRaises(ValueError):
+            self.mediator.subscribe(self.other, "orders..eu")
+        with self.assertRaises(ValueError):
+            self.mediator.set_publish_topic(self.other, "orders.")
+        with self.assertRaises(ValueError):
+            TopicMediator(default_topic="")
+
+    @patch("builtins.print")
+    def test_send_without_topic_uses_publish_topic(self, mock_print: MagicMock) -> None:
+        """Test that Mediator.send publishes on the colleague's publish topic or the default topic."""
+        self.mediator.subscribe(self.other, "broadcast")
+        User("a", self.mediator).send("hi")
+        self.assertEqual(self.other.received, ["hi"])
+        mock_print.assert_called_with("a: Sending message: hi")
+
+        self.mediator.set_publish_topic(self.books, "payments.card.eu")
+        self.books.send("pay")
+        self.mediator.set_publish_topic(self.books, None)
+        self.books.send("all")
+        self.assertEqual(self.other.received, ["hi", "pay", "all"])
+        self.assertEqual(self.everything.received, ["pay"])
+
+
+class TestAsyncChatRoom(unittest.IsolatedAsyncioTestCase):
+    """Unit tests for AsyncChatRoom delivery and slow-consumer policies."""
+
+    async def slow_room(self, policy: str) -> tuple[AsyncChatRoom, Recorder, GatedRecorder]:
+        """Return a room of a fast recorder and a stalled one, after sending "m1" to "m5" one loop turn apart."""
+        room = AsyncChatRoom(maxsize=2, policy=policy)
+        self.addAsyncCleanup(room.aclose)
+        fast, slow = Recorder(room), GatedRecorder(room)
+        room.add_colleague(fast)
+        room.add_colleague(slow)
+        for index in range(1, 6):
+            Recorder(room).send(f"m{index}")
+            await asyncio.sleep(0)
+        return room, fast, slow
+
+    async def test_drop_oldest(self) -> None:
+        """Test that a full queue keeps the newest messages and the fast member is unaffected."""
+        room, fast, slow = await self.slow_room("drop-oldest")
+        self.assertEqual(fast.received, ["m1", "m2", "m3", "m4", "m5"])
+        self.assertEqual(room.stats(slow).queue_depth, 2)
+        slow.gate.set()
+        await room.join()
+        self.assertEqual(slow.received, ["m1", "m4", "m5"])
+        stats = room.stats(slow)
+        self.assertEqual((stats.delivered, stats.dropped, stats.queue_depth), (3, 2, 0))
+        self.assertGreater(stats.max_latency, 0)
+        self.assertGreaterEqual(stats.max_latency, stats.mean_latency)
+
+    async def test_drop_new(self) -> None:
+        """Test that a full queue rejects new messages."""
+        room, _, slow = await self.slow_room("drop-new")
+        slow.gate.set()
+        await room.join()
+        self.assertEqual(slow.received, ["m1", "m2", "m3"])
+        self.assertEqual(room.stats(slow).dropped, 2)
+
+    async def test_disconnect(self) -> None:
+        """Test that overflowing a queue disconnects the member and keeps delivering to others."""
+        room, fast, slow = await self.slow_room("disconnect")
+        await room.join()
+        self.assertNotIn(slow, room)
+        self.assertEqual(room.disconnected, [slow.colleague_id])
+        self.assertEqual(list(room.metrics()), [fast.colleague_id])
+        self.assertEqual(fast.received, ["m1", "m2", "m3", "m4", "m5"])
+
+    async def test_failed_receipt_is_counted(self) -> None:
+        """Test that a receiver error is counted and later messages are still delivered."""
+        room = AsyncChatRoom()
+        self.addAsyncCleanup(room.aclose)
+        member = GatedRecorder(room)
+        member.gate.set()
+        room.add_colleague(member)
+        Recorder(room).send("boom")
+        Recorder(room).send("fine")
+        await room.join()
+        self.assertEqual(member.received, ["fine"])
+        self.assertEqual(room.stats(member).failed, 1)
+        with self.assertRaises(ValueError):
+            AsyncChatRoom(policy="drop-everything")
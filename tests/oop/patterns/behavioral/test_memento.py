@@ -1,9 +1,10 @@
 """Memento module tests"""
 
+import random
 import unittest
 from unittest.mock import MagicMock, patch
 
-from src.oop.patterns.behavioral.memento import TextEditor
+from src.oop.patterns.behavioral.memento import PieceTable, TextEditor
 
 
 class TestTextEditor(unittest.TestCase):
@@ -63,3 +64,60 @@ class TestTextEditor(unittest.TestCase):
         self.editor.undo()  # Undo "Hello, "
         self.editor.undo()  # No states to undo
         mock_print.assert_called_once_with("No states to undo.")
+
+
+class TestPieceTable(unittest.TestCase):
+    """Tests for the PieceTable text buffer."""
+
+    def test_matches_string_edits(self) -> None:
+        """Test random inserts, typing runs and deletes against plain string slicing."""
+        rng = random.Random(7)
+        text = "The quick brown fox jumps over the lazy dog."
+        buffer = PieceTable(text)
+        cursor = 0
+        for _ in range(2_000):
+            action = rng.random()
+            if action < 0.5:
+                cursor = cursor if rng.random() < 0.8 else rng.randint(0, len(text))
+                typed = rng.choice(["a", "bc", "é", "\n", "xyz"])
+                buffer.insert(cursor, typed)
+                text = text[:cursor] + typed + text[cursor:]
+                cursor += len(typed)
+            elif action < 0.8 and cursor:
+                length = rng.randint(1, min(cursor, 3))
+                cursor -= length
+                buffer.delete(cursor, length)
+                text = text[:cursor] + text[cursor + length :]
+            else:
+                position = rng.randint(0, len(text))
+                length = rng.randint(0, len(text) - position)
+                buffer.delete(position, length)
+                text = text[:position] + text[position + length :]
+                cursor = min(cursor, len(text))
+            self.assertEqual(len(buffer), len(text))
+            if rng.random() < 0.1:
+                self.assertEqual(buffer.get_text(), text)
+        self.assertEqual(buffer.get_text(), text)
+
+    def test_out_of_range(self) -> None:
+        """Test that edits outside the text are rejected."""
+        buffer = PieceTable("abc")
+        with self.assertRaises(IndexError):
+            buffer.insert(4, "x")
+        with self.assertRaises(IndexError):
+            buffer.delete(2, 2)
+        with self.assertRaises(IndexError):
+            buffer.delete(0, -1)
+
+    def test_editor_edits_and_undo(self) -> None:
+        """Test that TextEditor inserts, deletes and restores through the buffer."""
+        editor = TextEditor("Hello world")
+        editor.insert(5, ",")
+        editor.type("!")
+        editor.save()
+        editor.delete(0, 7)
+        self.assertEqual(editor.get_text(), "world!")
+        editor.save()
+        self.assertEqual(editor.undo(), "Hello, world!")
+        editor.type("?")
+        self.assertEqual(editor.get_text(), "Hello, world!?")